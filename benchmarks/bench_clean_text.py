@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Micro-benchmark for the epub_converter text hot path.
+
+Compares the original per-character ``clean_text`` + uncompiled
+``is_chapter_heading`` loop with the regex cleaner and ``HeadingMatcher``
+on a synthetic corpus, and prints lines/s for both.
+
+    python benchmarks/bench_clean_text.py --lines 1000000
+"""
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import epub_converter  # noqa: E402
+
+
+def legacy_clean_text(text: str) -> str:
+    allowed_chars = []
+    for ch in text:
+        code = ord(ch)
+        if ch in ('\t', '\n', '\r', ' ') or 0x20 <= code <= 0xD7FF or 0xE000 <= code <= 0xFFFD:
+            allowed_chars.append(ch)
+    return ''.join(allowed_chars)
+
+
+def legacy_is_chapter_heading(line: str) -> bool:
+    text = legacy_clean_text(line).strip()
+    if not text or len(text) > 50:
+        return False
+    norm = re.sub(r"[\s:：.-]+", "", text)
+    if norm in ("序", "序章", "楔子"):
+        return True
+    pat1 = (
+        r"^第[0-9零一二三四五六七八九十百千万〇两]+(?:卷|季|集|部|册)?"
+        r"(?:第[0-9零一二三四五六七八九十百千万〇两]+)?(?:章|回|篇|节|话).*"
+    )
+    pat2 = r"^[0-9一二三四五六七八九十百千万〇两]{1,4}[、.．]\S+"
+    return bool(re.match(pat1, norm) or re.match(pat2, text))
+
+
+def make_corpus(n_lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["他", "说", "天空", "修炼", "剑", "城市", "今天", "我们", "，", "。", "！", "一", "的", "了"]
+    lines = []
+    chapter = 0
+    for i in range(n_lines):
+        if i % 60 == 0:
+            chapter += 1
+            lines.append(f"第{chapter}章 风起云涌")
+        else:
+            lines.append('　　' + ''.join(rng.choice(words) for _ in range(rng.randint(10, 40))))
+    return '\n'.join(lines) + '\n'
+
+
+def run_legacy(corpus: str) -> int:
+    headings = 0
+    for raw in io.StringIO(corpus):
+        line = legacy_clean_text(raw.rstrip('\n'))
+        if legacy_is_chapter_heading(line):
+            headings += 1
+    return headings
+
+
+def run_fast(corpus: str) -> int:
+    headings = 0
+    is_heading = epub_converter.HeadingMatcher().match_clean
+    for line in epub_converter.iter_clean_lines(io.StringIO(corpus)):
+        if is_heading(line):
+            headings += 1
+    return headings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1_000_000, help='corpus size in lines')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.lines)
+    results = {}
+    for name, func in (('before', run_legacy), ('after', run_fast)):
+        start = time.perf_counter()
+        headings = func(corpus)
+        elapsed = time.perf_counter() - start
+        results[name] = (headings, elapsed)
+        print(f"{name:>6}: {args.lines / elapsed:>12,.0f} lines/s  ({elapsed:.2f}s, {headings} headings)")
+
+    if results['before'][0] != results['after'][0]:
+        print("WARNING: heading counts differ")
+    print(f"speedup: {results['before'][1] / results['after'][1]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark the txt -> EPUB converters against each other.
+
+Generates synthetic Chinese novels in several encodings and sizes, then runs
+every converter on every book in a fresh process so peak RSS is per run.
+Encoding detection, chapter parsing and zip writing are timed separately and
+the results are written to ``report.json`` and ``report.md``.
+
+    python benchmarks/bench_converters.py --sizes 1,5,20 --out bench_results
+
+Converters whose dependencies are missing (ebooklib, bs4, chardet, Pillow)
+are reported as skipped instead of failing the run.
+"""
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENCODINGS = ('utf-8', 'gb18030', 'utf-16')
+CONVERTERS = ('epub_converter', 'txt_to_epub', 'txt_to_epub_github')
+
+_WORDS = [
+    "他", "她", "说道", "天空", "修炼", "长剑", "城市", "今天", "我们", "宗门", "灵气",
+    "师兄", "突然", "一道", "光芒", "，", "，", "。", "。", "！", "？", "的", "了", "在",
+]
+
+
+def make_novel(path: str, size_mb: float, encoding: str, seed: int = 0) -> int:
+    """Write a synthetic novel of roughly *size_mb* MB; return the heading count."""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    chapter = 0
+    with open(path, 'w', encoding=encoding, newline='\n') as f:
+        header = "书名：基准测试\n作者：测试作者\n\n"
+        f.write(header)
+        written += len(header.encode(encoding))
+        while written < target:
+            chapter += 1
+            lines = [f"第{chapter}章 风起云涌{chapter}"]
+            for _ in range(rng.randint(30, 80)):
+                lines.append('　　' + ''.join(rng.choice(_WORDS) for _ in range(rng.randint(20, 80))))
+            block = '\n'.join(lines) + '\n'
+            f.write(block)
+            written += len(block.encode(encoding))
+    return chapter
+
+
+def _load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _stages_epub_converter(module) -> Dict[str, Callable]:
+    state = {}
+
+    def detect(path):
+        module.detect_encoding.cache_clear()
+        state['encoding'] = module.detect_encoding(path)
+        return state['encoding']
+
+    def parse(path):
+        state['author'] = module.detect_author(path)
+        state['chapters'] = module.parse_chapters(path)
+        return len(state['chapters'])
+
+    def write(path, out_path):
+        module.create_epub('基准测试', state['author'], state['chapters'], out_path)
+
+    return {'detect': detect, 'parse': parse, 'write': write}
+
+
+def _stages_txt_to_epub(module) -> Dict[str, Callable]:
+    from ebooklib import epub
+
+    state = {}
+
+    def detect(path):
+        state['encoding'] = module.detect_file_encoding(path)[0] or 'gb18030'
+        return state['encoding']
+
+    def parse(path):
+        with open(path, 'r', encoding=state['encoding'], errors='ignore') as f:
+            content = f.read()
+        state['chapters'] = module.split_chapters(content, '基准测试')
+        return len(state['chapters'])
+
+    def write(path, out_path):
+        book = epub.EpubBook()
+        book.set_identifier('id_bench')
+        book.set_title('基准测试')
+        book.set_language('zh')
+        book.add_author('测试作者')
+        items = []
+        for idx, (title, content) in enumerate(state['chapters'], 1):
+            c = module.create_chapter(title, content, idx)
+            book.add_item(c)
+            items.append(c)
+        book.toc = items
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        book.spine = ['nav'] + items
+        epub.write_epub(out_path, book, {})
+
+    return {'detect': detect, 'parse': parse, 'write': write}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and KiB elsewhere.
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def _run_case(converter: str, path: str, out_dir: str, queue):
+    """Child-process entry point: run one converter on one book."""
+    import logging
+    logging.disable(logging.WARNING)
+    record = {'converter': converter}
+    try:
+        if converter == 'epub_converter':
+            stages = _stages_epub_converter(_load_module('epub_converter', os.path.join(ROOT, 'epub_converter.py')))
+        elif converter == 'txt_to_epub':
+            sys.path.insert(0, os.path.join(ROOT, 'txttoepub'))
+            stages = _stages_txt_to_epub(_load_module('txt_to_epub', os.path.join(ROOT, 'txttoepub', 'txt_to_epub.py')))
+        else:
+            stages = _stages_epub_converter(
+                _load_module('txt_to_epub_github', os.path.join(ROOT, 'txttoepub', 'txt_to_epub_github.py'))
+            )
+    except ImportError as exc:
+        record['skipped'] = f"missing dependency: {exc.name or exc}"
+        queue.put(record)
+        return
+
+    out_path = os.path.join(out_dir, f"{converter}-{os.path.basename(path)}.epub")
+    try:
+        t0 = time.perf_counter()
+        record['detected_encoding'] = stages['detect'](path)
+        t1 = time.perf_counter()
+        record['chapters'] = stages['parse'](path)
+        t2 = time.perf_counter()
+        stages['write'](path, out_path)
+        t3 = time.perf_counter()
+    except Exception as exc:  # noqa: BLE001
+        record['error'] = f"{type(exc).__name__}: {exc}"
+        queue.put(record)
+        return
+    record.update({
+        'detect_s': t1 - t0,
+        'parse_s': t2 - t1,
+        'write_s': t3 - t2,
+        'total_s': t3 - t0,
+        'epub_mb': os.path.getsize(out_path) / (1024 * 1024),
+        'peak_rss_mb': _peak_rss_mb(),
+    })
+    queue.put(record)
+
+
+def run_benchmarks(sizes: List[float], encodings: List[str], converters: List[str],
+                   repeat: int, work_dir: str) -> List[dict]:
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for size in sizes:
+        for enc in encodings:
+            path = os.path.join(work_dir, f"bench-{size:g}mb-{enc}.txt")
+            expected = make_novel(path, size, enc)
+            src_mb = os.path.getsize(path) / (1024 * 1024)
+            for converter in converters:
+                best = None
+                for _ in range(repeat):
+                    queue = ctx.Queue()
+                    proc = ctx.Process(target=_run_case, args=(converter, path, work_dir, queue))
+                    proc.start()
+                    record = queue.get()
+                    proc.join()
+                    if 'total_s' not in record:
+                        best = record
+                        break
+                    if best is None or record['total_s'] < best['total_s']:
+                        best = record
+                best.update({'encoding': enc, 'size_mb': round(src_mb, 2), 'headings': expected})
+                results.append(best)
+                status = best.get('skipped') or best.get('error') or f"{best['total_s']:.2f}s"
+                print(f"{converter:>20} {enc:>8} {src_mb:7.2f} MB  {status}")
+    return results
+
+
+def write_reports(results: List[dict], out_dir: str):
+    os.makedirs(out_dir, exist_ok=True)
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(os.path.join(out_dir, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2)
+
+    def fmt(value, spec='.3f'):
+        return '-' if value is None else format(value, spec)
+
+    lines = [
+        '# txt → EPUB converter benchmark',
+        '',
+        f"Python {meta['python']} on {meta['platform']}, {meta['timestamp']}",
+        '',
+        '| converter | encoding | size MB | detected | chapters (headings) | detect s | parse s | write s | total s | MB/s | peak RSS MB |',
+        '|---|---|---|---|---|---|---|---|---|---|---|',
+    ]
+    for r in results:
+        if 'total_s' not in r:
+            note = r.get('skipped') or r.get('error')
+            lines.append(f"| {r['converter']} | {r['encoding']} | {r['size_mb']} | {note} |||||||")
+            continue
+        lines.append(
+            f"| {r['converter']} | {r['encoding']} | {r['size_mb']} | {r['detected_encoding']} "
+            f"| {r['chapters']} ({r['headings']}) | {fmt(r['detect_s'])} | {fmt(r['parse_s'])} "
+            f"| {fmt(r['write_s'])} | {fmt(r['total_s'])} | {fmt(r['size_mb'] / r['total_s'], '.2f')} "
+            f"| {fmt(r['peak_rss_mb'], '.1f')} |"
+        )
+    with open(os.path.join(out_dir, 'report.md'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the txt -> EPUB converters")
+    parser.add_argument('--sizes', default='1,5,20', help='comma separated book sizes in MB')
+    parser.add_argument('--encodings', default=','.join(ENCODINGS), help='comma separated encodings')
+    parser.add_argument('--converters', default=','.join(CONVERTERS), help='comma separated converters')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case, the fastest is kept')
+    parser.add_argument('--out', default='bench_results', help='report directory')
+    args = parser.parse_args()
+
+    sizes = [float(s) for s in args.sizes.split(',') if s]
+    encodings = [e for e in args.encodings.split(',') if e]
+    converters = [c for c in args.converters.split(',') if c]
+    unknown = set(converters) - set(CONVERTERS)
+    if unknown:
+        parser.error(f"unknown converters: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory(prefix='epub-bench-') as work_dir:
+        results = run_benchmarks(sizes, encodings, converters, max(1, args.repeat), work_dir)
+    write_reports(results, args.out)
+    print(f"Report written to {os.path.join(args.out, 'report.md')}")
+
+
+if __name__ == '__main__':
+    main()
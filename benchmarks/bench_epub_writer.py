@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Scaling check for ``epub_converter.EpubWriter`` on books with many chapters.
+
+Writes synthetic books of increasing chapter counts (chapters are generated
+on the fly, as ``stream_epub`` does) and prints time per chapter and the
+Python heap peak from ``tracemalloc``. Time per chapter should stay flat
+(linear total time) and the peak should grow only by the per-chapter
+bookkeeping: the title kept for the index and zipfile's directory record.
+
+    python benchmarks/bench_epub_writer.py --chapters 2500,5000,10000,20000 --level 1
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from epub_converter import EpubWriter  # noqa: E402
+
+PARAGRAPH = '　　他抬头望向天空，一道光芒从云层中落下，宗门上下一片寂静。'
+
+
+def write_book(path: str, n_chapters: int, level, paras: int) -> None:
+    with EpubWriter(path, level) as writer:
+        for i in range(1, n_chapters + 1):
+            writer.add_text_chapter(f"第{i}章 风起云涌", '\n'.join([PARAGRAPH] * paras))
+        writer.close('基准测试', '测试作者')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chapters', default='2500,5000,10000,20000', help='comma separated chapter counts')
+    parser.add_argument('--level', type=int, default=None, help='deflate level (default: store)')
+    parser.add_argument('--paras', type=int, default=30, help='paragraphs per chapter')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'chapters':>9} {'seconds':>8} {'us/chapter':>11} {'peak heap MB':>13} {'epub MB':>8}")
+    with tempfile.TemporaryDirectory(prefix='epub-writer-') as tmp:
+        for n in (int(c) for c in args.chapters.split(',') if c):
+            path = os.path.join(tmp, f"book-{n}.epub")
+            tracemalloc.start()
+            start = time.perf_counter()
+            write_book(path, n, args.level, args.paras)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{n:>9} {elapsed:>8.2f} {elapsed / n * 1e6:>11.1f} {peak / 2**20:>13.2f} "
+                  f"{os.path.getsize(path) / 2**20:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""MB/s of parse_chapters, line by line and with the memory-mapped scan.
+
+Generates a synthetic novel per encoding, checks that both modes return the
+same chapters (with and without volume detection) and times them. The
+mmap scan is forced at every size, so the results show where
+``epub_converter.MMAP_MIN_SIZE`` should sit.
+
+    python benchmarks/bench_parse.py --size 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import epub_converter  # noqa: E402
+from bench_converters import make_novel  # noqa: E402
+
+
+def bench(path: str, size_mb: float, volumes: bool, use_mmap: bool):
+    start = time.perf_counter()
+    chapters = epub_converter.parse_chapters(path, volumes, use_mmap, mmap_min_size=0)
+    elapsed = time.perf_counter() - start
+    return chapters, size_mb / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=float, default=100, help='book size in MB')
+    parser.add_argument('--encodings', default='utf-8,gb18030', help='comma separated encodings')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='epub-parse-') as work_dir:
+        for enc in (e for e in args.encodings.split(',') if e):
+            path = os.path.join(work_dir, f"parse-{enc}.txt")
+            make_novel(path, args.size, enc)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            epub_converter.detect_encoding(path)
+            for volumes in (False, True):
+                lines, lines_rate = bench(path, size_mb, volumes, False)
+                mapped, mmap_rate = bench(path, size_mb, volumes, True)
+                print(f"{enc:>8} volumes={volumes!s:<5} {len(lines):>6} chapters  "
+                      f"lines {lines_rate:7.1f} MB/s  mmap {mmap_rate:7.1f} MB/s  "
+                      f"identical: {lines == mapped}")
+
+
+if __name__ == '__main__':
+    main()
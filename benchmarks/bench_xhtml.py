@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Chapters/s of the XHTML chapter emitters, old and new.
+
+Checks that ``xhtml_writer`` produces the same markup as the code it
+replaced (the BeautifulSoup builder in ``txt_to_epub.create_chapter`` and the
+per-paragraph escaping in ``chapter_to_xhtml``) and times both.
+
+    python benchmarks/bench_xhtml.py --chapters 2000
+"""
+import argparse
+import html
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xhtml_writer  # noqa: E402
+from epub_converter import clean_text  # noqa: E402
+
+
+def legacy_soup_fragment(title: str, content: str) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup('', 'html.parser')
+    h1 = soup.new_tag('h1')
+    h1.string = title
+    soup.append(h1)
+    for para in content.split('\n'):
+        if para.strip():
+            p = soup.new_tag('p')
+            p.string = para.strip()
+            soup.append(p)
+    return str(soup)
+
+
+def legacy_chapter_to_xhtml(idx: int, title: str, text: str) -> str:
+    esc_title = html.escape(clean_text(title))
+    paras = [f"    <p>{html.escape(clean_text(p.strip()))}</p>" for p in text.splitlines() if p.strip()]
+    return (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        "<html xmlns='http://www.w3.org/1999/xhtml'>\n<head>\n  <title>" + esc_title + "</title>\n  <link rel='stylesheet' type='text/css' href='style.css'/>\n</head>\n<body>\n  <h2 id='chap" + str(idx) + "'>" + esc_title + "</h2>\n" +
+        '\n'.join(paras) + "\n</body>\n</html>"
+    )
+
+
+def make_chapters(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["他说", "“你好”", "<剑>", "A&B", "'引号'", "天空", "。", "，", "　", " "]
+    chapters = []
+    for i in range(1, n + 1):
+        paras = ['　　' + ''.join(rng.choice(words) for _ in range(rng.randint(10, 60)))
+                 for _ in range(rng.randint(20, 60))]
+        paras.insert(rng.randint(0, len(paras)), '')
+        if i % 50 == 0:
+            # The odd chapter still carries control characters from the source.
+            paras.append('\x01坏字符\x0b')
+        chapters.append((f"第{i}章 <试炼> & 成长", '\n'.join(paras)))
+    return chapters
+
+
+def bench(name, func, chapters):
+    start = time.perf_counter()
+    out = [func(i, t, c) for i, (t, c) in enumerate(chapters, 1)]
+    elapsed = time.perf_counter() - start
+    print(f"{name:>28}: {len(chapters) / elapsed:>10,.0f} chapters/s")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chapters', type=int, default=2000, help='number of synthetic chapters')
+    args = parser.parse_args()
+    chapters = make_chapters(args.chapters)
+
+    old = bench('chapter_to_xhtml (before)', legacy_chapter_to_xhtml, chapters)
+    new = bench('chapter_document (after)', lambda i, t, c: xhtml_writer.chapter_document(i, t, c, clean_text), chapters)
+    print(f"{'identical output':>28}: {old == new}")
+
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print(f"{'BeautifulSoup (before)':>28}: skipped, bs4 not installed")
+        new = bench('chapter_fragment (after)', lambda i, t, c: xhtml_writer.chapter_fragment(t, c), chapters)
+        return
+    old = bench('BeautifulSoup (before)', lambda i, t, c: legacy_soup_fragment(t, c), chapters)
+    new = bench('chapter_fragment (after)', lambda i, t, c: xhtml_writer.chapter_fragment(t, c), chapters)
+    print(f"{'identical output':>28}: {old == new}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Seconds per workbook of a few cell edits: openpyxl load/save vs xlsx_patch.
+
+Pass real DO/Invoice workbooks to measure those (they are copied, never
+modified); without arguments a synthetic DO + Invoice workbook of --rows
+rows is generated. The edits are the ones renamemos/editsum make, and the
+values read back from both outputs are compared.
+
+    python benchmarks/bench_xlsx_patch.py "MOS xx25 - 001 - DO & INV.xlsx" --repeat 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook, load_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'copypasterfile'))
+
+from xlsx_patch import patch_cells  # noqa: E402
+
+EDITS = {
+    'DO': {'C10': 'Honey Mustard Sauce', 'K10': 'PKTS'},
+    'Invoice': {'C10': 'Honey Mustard Sauce', 'H30': 'Sub-Total', 'I31': '=I30*0.09', 'I32': '=I30+I31'},
+}
+
+
+def make_workbook(path: str, rows: int):
+    wb = Workbook()
+    wb.active.title = 'DO'
+    for ws in (wb['DO'], wb.create_sheet('Invoice')):
+        ws.append(['No', 'Code', 'Description', 'Qty', 'Unit', 'Price', 'Disc', 'Remark', 'Amount'])
+        for r in range(2, rows + 1):
+            ws.append([r - 1, f'P{r:05d}', f'Item {r} 1kg', r % 7 + 1, 'PKT', 3.5, 0, '', f'=D{r}*F{r}'])
+    wb.save(path)
+
+
+def with_openpyxl(path: str, edits: dict):
+    wb = load_workbook(path)
+    for sheet, cells in edits.items():
+        for ref, value in cells.items():
+            wb[sheet][ref] = value
+    wb.save(path)
+
+
+def read_back(path: str, edits: dict) -> dict:
+    wb = load_workbook(path, read_only=True)
+    values = {(sheet, ref): wb[sheet][ref].value for sheet, cells in edits.items() for ref in cells}
+    wb.close()
+    return values
+
+
+def bench(func, src: str, dst: str, edits: dict, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        shutil.copyfile(src, dst)
+        start = time.perf_counter()
+        func(dst, edits)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('workbooks', nargs='*', help='DO/Invoice workbooks to measure')
+    parser.add_argument('--rows', type=int, default=200, help='rows per sheet of the synthetic workbook')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='xlsx-patch-') as work_dir:
+        sources = args.workbooks
+        if not sources:
+            sources = [os.path.join(work_dir, f'synthetic-{args.rows}.xlsx')]
+            make_workbook(sources[0], args.rows)
+        for src in sources:
+            names = load_workbook(src, read_only=True).sheetnames
+            edits = {sheet: cells for sheet, cells in EDITS.items() if sheet in names}
+            full_path = os.path.join(work_dir, 'openpyxl.xlsx')
+            patch_path = os.path.join(work_dir, 'patched.xlsx')
+            full = bench(with_openpyxl, src, full_path, edits, args.repeat)
+            patched = bench(patch_cells, src, patch_path, edits, args.repeat)
+            same = read_back(full_path, edits) == read_back(patch_path, edits)
+            print(f"{os.path.basename(src)[:40]:<40} {os.path.getsize(src) / 1024:8.0f} KB  "
+                  f"openpyxl {full:7.3f}s  patch {patched:7.3f}s  x{full / patched:6.1f}  identical: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,52 +1,44 @@
 import os
-import re
+import sys
 from collections import defaultdict
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from do_inv_index import open_index
+
 BASE_DIR = r"C:\Users\User\Dropbox\DO & INV\DO & INV 2025"
 
 # 精准匹配 INV 或 DO & INV（大小写不敏感）
 valid_tags = {"INV", "DO & INV"}
 
-pattern = re.compile(
-    r"^(.+?)\s*(\d{4})\s*-\s*(\d{3})\s*-\s*([A-Z &]+)", re.IGNORECASE
-)
+# 只保留指定月份年份的文件（例如 "0425"）
+target_month = "0525" #editable variable
 
 files = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: {"xlsx": [], "pdf": []})))
 invalid_files = []
 
-for root, _, filenames in os.walk(BASE_DIR):
-    for filename in filenames:
-        ext = os.path.splitext(filename)[1].lower()
-        if ext not in [".xlsx", ".pdf"]:
-            continue
-
-        match = pattern.match(filename)
-        # 只保留指定月份年份的文件（例如 "0425"）
-        target_month = "0525" #editable variable
-        if target_month not in filename:
-            continue
-
-        if not match:
-            continue  # 跳过无编号或无类型的文件
-
-        prefix, year, num, doc_type_raw = match.groups()
-        doc_type = doc_type_raw.strip().upper()
-        number = int(num)
-        prefix = prefix.strip()
-        year = year.strip()
-        path = os.path.join(root, filename)
-
-        # 跳过无 INV / DO & INV 类型的命名（如只是 xxx - 001）
-        if doc_type not in valid_tags:
-            # 但如果 doc_type 是拼错的（如 NV），则视为命名错误
-            if "INV" in doc_type or "NV" in doc_type or "IN" == doc_type:
-                invalid_files.append(path)
-            continue
-
-        if ext == ".xlsx" and doc_type == "DO & INV":
-            files[prefix][year][number]["xlsx"].append(path)
-        elif ext == ".pdf" and doc_type == "INV":
-            files[prefix][year][number]["pdf"].append(path)
+# 文件名已在索引里解析好，不再遍历整个目录树
+with open_index(BASE_DIR) as index:
+    rows = index.query(mmyy=target_month, ext=[".xlsx", ".pdf"])
+
+for row in rows:
+    if row["number"] is None:
+        continue  # 跳过无编号或无类型的文件
+
+    ext = row["ext"]
+    prefix, year, number, doc_type = row["prefix"], row["mmyy"], row["number"], row["doc_type"]
+    path = row["path"]
+
+    # 跳过无 INV / DO & INV 类型的命名（如只是 xxx - 001）
+    if doc_type not in valid_tags:
+        # 但如果 doc_type 是拼错的（如 NV），则视为命名错误
+        if "INV" in doc_type or "NV" in doc_type or "IN" == doc_type:
+            invalid_files.append(path)
+        continue
+
+    if ext == ".xlsx" and doc_type == "DO & INV":
+        files[prefix][year][number]["xlsx"].append(path)
+    elif ext == ".pdf" and doc_type == "INV":
+        files[prefix][year][number]["pdf"].append(path)
 
 # === 输出报告 ===
 print("📂 文件检查报告 v2.5")
@@ -1,7 +1,11 @@
 import os
 import re
+import sys
 from PyPDF2 import PdfMerger
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from do_inv_index import open_index
+
 # 根目录路径
 ROOT_DIR = r"C:\Users\User\Dropbox\DO & INV\DO & INV 2025"
 
@@ -54,23 +58,10 @@ def merge_pdfs_in_folder(folder_path: str, pdf_files: list, output_name: str):
     except Exception as e:
         print(f"[ERROR] Writing merged PDF: {e}")
 
-def process_folder(folder_path: str):
+def process_folder(folder_path: str, matched_pdfs: list):
     folder_name = os.path.basename(folder_path)
     month = get_month_from_folder(folder_name)
     if not month:
-        print(f"[SKIP] Folder '{folder_name}' does not match '{TARGET_MONTH}. Xxx' format.")
-        return
-
-    try:
-        all_entries = os.listdir(folder_path)
-    except Exception as e:
-        print(f"[ERROR] Cannot list folder '{folder_path}': {e}")
-        return
-
-    matched_pdfs = [f for f in all_entries if invoice_pattern.match(f)]
-
-    if not matched_pdfs:
-        print(f"[INFO] No invoice PDF matched in '{folder_path}'.")
         return
 
     print(f"\n[INFO] In '{folder_path}' => matched PDFs: {matched_pdfs}")
@@ -89,20 +80,13 @@ def process_folder(folder_path: str):
     output_name = f"{prefix_safe} INV - {month}'25.pdf".strip()
     merge_pdfs_in_folder(folder_path, matched_pdfs, output_name)
 
-def recursive_search(current_dir: str):
-    if contains_supplier(current_dir):
-        print(f"[SKIP] '{current_dir}' (contains supplier-related keywords).")
-        return
-
-    process_folder(current_dir)
-
-    try:
-        with os.scandir(current_dir) as it:
-            for entry in it:
-                if entry.is_dir():
-                    recursive_search(entry.path)
-    except Exception as e:
-        print(f"[ERROR] Scanning subdirs of '{current_dir}': {e}")
+def find_invoice_folders(index) -> dict:
+    """从文件索引中找出含有发票 PDF 的文件夹：{folder: [pdf names]}，不再遍历整个目录树。"""
+    folders = {}
+    for row in index.query(ext='.pdf'):
+        if invoice_pattern.match(row['name']):
+            folders.setdefault(row['dir'], []).append(row['name'])
+    return folders
 
 def main():
     if not os.path.isdir(ROOT_DIR):
@@ -110,7 +94,15 @@ def main():
         return
 
     print(f"[START] Searching from: {ROOT_DIR}")
-    recursive_search(ROOT_DIR)
+    with open_index(ROOT_DIR) as index:
+        folders = find_invoice_folders(index)
+    for folder_path, matched_pdfs in sorted(folders.items()):
+        if not get_month_from_folder(os.path.basename(folder_path)):
+            continue
+        if contains_supplier(folder_path):
+            print(f"[SKIP] '{folder_path}' (contains supplier-related keywords).")
+            continue
+        process_folder(folder_path, matched_pdfs)
     print("[DONE] Finished.")
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+"""
+批量复制和设置单元格格式，直接使用 openpyxl 内部的样式编号。
+
+openpyxl keeps every font, fill, border, alignment and protection of a
+workbook in a de-duplicated list, and a cell only holds a ``StyleArray`` of
+indexes into those lists (``cell._style``). Assigning ``cell.fill = ...``
+hashes the fill to find its index, on every cell; ``copy(cell.font)`` and
+friends build new style objects that are hashed again when assigned.
+
+The helpers here work on the indexes instead: :func:`copy_format` copies the
+``StyleArray`` as ``copysalessummary.py`` does, and :class:`StyleCache`
+looks each style object up once per workbook and remembers every
+``(old style, change) -> new style`` combination, so restyling a range of
+cells that share a few styles costs a dict lookup and an array copy per
+cell.
+"""
+from copy import copy
+
+from openpyxl.styles import PatternFill
+from openpyxl.styles.cell_style import StyleArray
+
+NO_FILL = PatternFill(fill_type=None)
+
+# StyleArray field -> workbook collection, for the attributes StyleCache.restyle takes
+_COLLECTIONS = {
+    'font': ('fontId', '_fonts'),
+    'fill': ('fillId', '_fills'),
+    'border': ('borderId', '_borders'),
+    'alignment': ('alignmentId', '_alignments'),
+    'protection': ('protectionId', '_protections'),
+}
+
+
+def solid_fill(color):
+    """A solid :class:`PatternFill` of *color* (``'FFC000'``), or no fill for None."""
+    if color is None:
+        return NO_FILL
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+def copy_format(source_cell, target_cell):
+    """Copy the whole format of *source_cell* to *target_cell*; return True if it changed.
+
+    Unstyled source cells are skipped, as the old per-attribute copy did.
+    """
+    if not source_cell.has_style:
+        return False
+    if target_cell.has_style and target_cell._style == source_cell._style:
+        return False
+    target_cell._style = copy(source_cell._style)
+    return True
+
+
+class StyleCache:
+    """Interned style changes for one workbook; see the module docstring."""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._ids = {}
+        self._styles = {}
+
+    def style_id(self, attr, value):
+        """Index of *value* (a Font, PatternFill, …) in the workbook list for *attr*."""
+        # Keyed by identity: hashing a style object is the cost being avoided.
+        # The object is kept alive with its index so the id stays unique.
+        key = (attr, id(value))
+        hit = self._ids.get(key)
+        if hit is None:
+            hit = self._ids[key] = (value, getattr(self.workbook, _COLLECTIONS[attr][1]).add(value))
+        return hit[1]
+
+    def restyle(self, cell, **changes):
+        """Set the given style attributes (``fill=``, ``font=`` …) of *cell*; return True if it changed."""
+        old = cell._style if cell.has_style else None
+        key = (tuple(old) if old is not None else None,
+               tuple(sorted((attr, id(value)) for attr, value in changes.items())))
+        new = self._styles.get(key)
+        if new is None:
+            new = copy(old) if old is not None else StyleArray()
+            for attr, value in changes.items():
+                setattr(new, _COLLECTIONS[attr][0], self.style_id(attr, value))
+            self._styles[key] = new
+        if old == new or (old is None and new == StyleArray()):
+            return False
+        cell._style = copy(new)
+        return True
+
+    def fill_range(self, sheet, fill, min_row=None, max_row=None, min_col=None, max_col=None):
+        """Give every cell of the range (default: the used range) *fill*; return cells changed."""
+        rows = range(min_row or 1, (max_row or sheet.max_row) + 1)
+        return self.fill_rows(sheet, rows, fill, min_col, max_col)
+
+    def fill_rows(self, sheet, rows, fill, min_col=None, max_col=None):
+        """Give the cells of each row number in *rows* *fill*; return cells changed.
+
+        Clearing (``NO_FILL``) only visits existing cells, so it never grows
+        the sheet.
+        """
+        cols = range(min_col or 1, (max_col or sheet.max_column) + 1)
+        if fill == NO_FILL:
+            rows = set(rows)
+            cells = [cell for (r, c), cell in sheet._cells.items() if r in rows and c in cols]
+        else:
+            cells = [sheet.cell(row=r, column=c) for r in rows for c in cols]
+        return sum(self.restyle(cell, fill=fill) for cell in cells)
+
+
+def copy_row_format(sheet, source_row, target_rows):
+    """Copy the format of every styled cell in *source_row* to each row of *target_rows*.
+
+    Returns the number of cells changed.
+    """
+    source = [cell for cell in sheet[source_row] if cell.has_style]
+    changed = 0
+    for r in target_rows:
+        for src in source:
+            changed += copy_format(src, sheet.cell(row=r, column=src.column))
+    return changed
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare editsum.py with the original full-sheet scan on awkward Invoice layouts.
+
+Each case is written to a temporary workbook, updated with the original
+algorithm (``baseline``) and with ``editsum.update_workbook``, and the
+column I values of both results are compared. Cases cover Subtotal, GST 9%
+and Total rows that are not adjacent, "Total" in a header, a missing label,
+labels repeated further up the sheet, labels with extra text ("Sub Total",
+"Total (SGD)", "GST 9% :") and labels outside column H.
+
+    python copypasterfile/check_editsum.py
+"""
+import os
+import sys
+import tempfile
+
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import editsum  # noqa: E402
+
+
+def baseline(path):
+    """The Subtotal/GST/Total update of editsum.py before it used workbook_rules."""
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook[[s for s in workbook.sheetnames if s.strip().lower() == "invoice"][0]]
+    amount_column = 9
+    subtotal_row = gst_row = total_row = None
+    for row in sheet.iter_rows():
+        for cell in row:
+            if cell.value and isinstance(cell.value, str):
+                cell_value = cell.value.strip().lower()
+                if "subtotal" in cell_value:
+                    subtotal_row = cell.row
+                elif "gst 9%" in cell_value:
+                    gst_row = cell.row
+                elif "total" in cell_value:
+                    total_row = cell.row
+    if not subtotal_row or not gst_row or not total_row:
+        return
+    if any(sheet.cell(row=r, column=amount_column).value is not None for r in range(1, subtotal_row)):
+        sheet.cell(row=subtotal_row, column=amount_column).value = f"=SUM(I24:I{subtotal_row - 1})"
+    sheet.cell(row=gst_row, column=amount_column).value = f"=I{subtotal_row}*0.09"
+    sheet.cell(row=total_row, column=amount_column).value = f"=sum(I{subtotal_row}:I{gst_row})"
+    workbook.save(path)
+
+
+CASES = {
+    'adjacent': {'H30': 'Subtotal', 'H31': 'GST 9%', 'H32': 'Total'},
+    'blank lines between': {'H30': 'Subtotal', 'H32': 'GST 9%', 'H35': 'Total'},
+    'header with Total': {'H23': 'Total Amount', 'I23': 'Total Amount', 'H30': 'Subtotal',
+                          'H31': 'GST 9%', 'H33': 'Total'},
+    'only Total': {'H32': 'Total'},
+    'labels repeated above': {'H10': 'Subtotal', 'H11': 'GST 9%', 'H12': 'Total',
+                              'H40': 'Subtotal:', 'H42': 'GST 9%', 'H43': 'TOTAL'},
+    'labels with extra text': {'H30': 'Subtotal (SGD)', 'H31': 'GST 9% :', 'H32': 'Total (SGD)'},
+    'Sub Total': {'H30': 'Sub Total', 'H31': 'GST 9%', 'H32': 'Grand Total'},
+    'labels in column G': {'G30': 'Subtotal', 'G31': 'GST 9%', 'G32': 'Total'},
+    'labels in mixed columns': {'G30': 'Subtotal', 'H31': 'GST 9%:', 'C33': 'TOTAL AMOUNT'},
+}
+
+
+def make_workbook(path, cells):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Invoice'
+    for r in range(24, 29):
+        sheet.cell(row=r, column=3, value=f'Item {r}')
+        sheet.cell(row=r, column=9, value=r * 1.5)
+    for ref, value in cells.items():
+        sheet[ref] = value
+    workbook.save(path)
+
+
+def amounts(path):
+    sheet = openpyxl.load_workbook(path)['Invoice']
+    return {cell.coordinate: cell.value for row in sheet.iter_rows(min_col=9, max_col=9) for cell in row
+            if cell.value is not None}
+
+
+def main():
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix='editsum-') as work_dir:
+        for name, cells in CASES.items():
+            old_path = os.path.join(work_dir, 'old.xlsx')
+            new_path = os.path.join(work_dir, 'new.xlsx')
+            make_workbook(old_path, cells)
+            make_workbook(new_path, cells)
+            baseline(old_path)
+            editsum.update_workbook(new_path)
+            same = amounts(old_path) == amounts(new_path)
+            failed += not same
+            print(f"{name:<24} identical: {same}")
+            if not same:
+                print(f"    original {amounts(old_path)}\n    editsum  {amounts(new_path)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
 import os
 import re
 import shutil
+import sys
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 from ttkbootstrap import Treeview
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from do_inv_index import open_index
+
 def main():
     file_info_list = []
     selected_files = []
@@ -67,18 +71,18 @@ def main():
         file_info_list.clear()
         file_tree.delete(*file_tree.get_children())
 
-        for root_dir, dirs, files in os.walk(source_dir):
-            for file in files:
-                full_path = os.path.join(root_dir, file)
-                if os.path.isfile(full_path):
-                    filename_no_ext = os.path.splitext(file)[0]
-                    match_1 = file_pattern_1.match(filename_no_ext)
-                    match_2 = file_pattern_2.match(filename_no_ext)
-                    if match_1 or match_2:
-                        name = match_1.group(1).strip() if match_1 else match_2.group(1).strip()
-                        display = f"{len(file_info_list) + 1}. {name}"
-                        file_info_list.append({'display_name': display, 'file_path': full_path})
-                        file_tree.insert("", END, values=(display,))
+        # 从文件索引查询 xx25 的 DO & INV 模板，不再遍历整个目录树
+        with open_index(source_dir) as index:
+            rows = index.query(mmyy='xx25', doc_type='DO & INV')
+        for row in rows:
+            filename_no_ext = os.path.splitext(row['name'])[0]
+            match_1 = file_pattern_1.match(filename_no_ext)
+            match_2 = file_pattern_2.match(filename_no_ext)
+            if match_1 or match_2:
+                name = match_1.group(1).strip() if match_1 else match_2.group(1).strip()
+                display = f"{len(file_info_list) + 1}. {name}"
+                file_info_list.append({'display_name': display, 'file_path': row['path']})
+                file_tree.insert("", END, values=(display,))
 
         if not file_info_list:
             messagebox.showinfo("提示", "未找到符合条件的文件。")
@@ -1,4 +1,8 @@
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from do_inv_index import open_index
 
 def find_and_create_folders(base_path):
     """
@@ -8,21 +12,22 @@ def find_and_create_folders(base_path):
     """
     folders_to_create = set()
 
-    for root, dirs, files in os.walk(base_path):
-        abs_root = os.path.abspath(root)
+    # 从索引中找出包含 xx25 文件的路径，不再遍历整个目录树
+    with open_index(base_path) as index:
+        roots = sorted({row['dir'] for row in index.query(name_like='xx25', ext='.xlsx')})
+
+    for abs_root in roots:
         root_lower = abs_root.lower()
 
-        # 找出包含 xx25 文件的路径
-        if any(file.lower().endswith('.xlsx') and 'xx25' in file.lower() for file in files):
-            # 如果路径中有 format 或 history，则记录“父路径”
-            if 'format' in root_lower or 'history' in root_lower:
-                target_path = os.path.dirname(abs_root)
-                print(f"📂 xx25 found in format/history path, will create in parent: {target_path}")
-            else:
-                target_path = abs_root
-                print(f"📁 xx25 found in: {abs_root}")
-
-            folders_to_create.add(target_path)
+        # 如果路径中有 format 或 history，则记录“父路径”
+        if 'format' in root_lower or 'history' in root_lower:
+            target_path = os.path.dirname(abs_root)
+            print(f"📂 xx25 found in format/history path, will create in parent: {target_path}")
+        else:
+            target_path = abs_root
+            print(f"📁 xx25 found in: {abs_root}")
+
+        folders_to_create.add(target_path)
 
     # 创建 4. Apr 文件夹（如果不存在）
     for path in folders_to_create:
@@ -1,79 +1,127 @@
+import argparse
 import os
-import openpyxl
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 
-def update_Invoice_formulas(directory):
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(('.xlsx', '.xlsm')):
-                file_path = os.path.join(root, file)
-                print(f"Processing: {file_path}")
-
-                try:
-                    workbook = openpyxl.load_workbook(file_path)
-
-                    # Ensure the "Invoice" sheet exists
-                    if "invoice" not in [sheet.lower() for sheet in workbook.sheetnames]:
-                        print(f"Sheet 'Invoice' not found in {file_path}")
-                        continue
-
-                    # Match "Invoice" sheet case-insensitively
-                    sheet = workbook[[sheet for sheet in workbook.sheetnames if sheet.strip().lower() == "invoice"][0]]
-
-                    # Set "Amount" column to column I (Excel column index starts from 1, so I = 9)
-                    amount_column = 9
-
-                    # Identify rows with "Subtotal", "GST 9%", and "Total"
-                    subtotal_row = None
-                    gst_row = None
-                    total_row = None
-
-                    for row in sheet.iter_rows():
-                        for cell in row:
-                            if cell.value and isinstance(cell.value, str):
-                                cell_value = cell.value.strip().lower()
-                                if "subtotal" in cell_value:
-                                    subtotal_row = cell.row
-                                elif "gst 9%" in cell_value:
-                                    gst_row = cell.row
-                                elif "total" in cell_value:
-                                    total_row = cell.row
-
-                    # Debugging logs
-                    print(f"Subtotal row: {subtotal_row}, GST row: {gst_row}, Total row: {total_row}, Amount column: {amount_column}")
-
-                    if not subtotal_row or not gst_row or not total_row:
-                        print(f"Required rows not found in 'Invoice' sheet of {file_path}")
-                        continue
-
-                    # Update Subtotal formula
-                    amount_start_row = None
-                    for row in range(1, subtotal_row):
-                        if sheet.cell(row=row, column=amount_column).value is not None:
-                            amount_start_row = row
-                            break
-
-                    if amount_start_row:
-                        subtotal_cell = sheet.cell(row=subtotal_row, column=amount_column)
-                        subtotal_cell.value = f"=SUM({sheet.cell(row=24, column=amount_column).coordinate}:{sheet.cell(row=subtotal_row - 1, column=amount_column).coordinate})"
-                        print(f"Updated Subtotal formula to: {subtotal_cell.value}")
-
-                    # Update GST formula
-                    gst_cell = sheet.cell(row=gst_row, column=amount_column)
-                    gst_cell.value = f"={sheet.cell(row=subtotal_row, column=amount_column).coordinate}*0.09"
-                    print(f"Updated GST formula to: {gst_cell.value}")
-
-                    # Update Total formula
-                    total_cell = sheet.cell(row=total_row, column=amount_column)
-                    total_cell.value = f"=sum({sheet.cell(row=subtotal_row, column=amount_column).coordinate}:{sheet.cell(row=gst_row, column=amount_column).coordinate})"
-                    print(f"Updated Total formula to: {total_cell.value}")
-
-                    # Save the workbook
-                    workbook.save(file_path)
-                    print(f"Updated and saved: {file_path}")
-
-                except Exception as e:
-                    print(f"Failed to process {file_path}: {e}")
-
-# Example usage
-directory_path = r"C:\\Users\\User\\Dropbox\\DO & INV\\DO & INV 2025\\Melvin - MOS Burger\\For Customer\\MOS DOC (OTL) - Format"
-update_Invoice_formulas(directory_path)
+import openpyxl
+from openpyxl.utils import column_index_from_string, coordinate_to_tuple
+
+from workbook_rules import EXCEL_SUFFIXES, SheetText, _columns, write_cells
+
+# Amount is column I. A text cell anywhere in the row that contains
+# "subtotal", else "gst 9%", else "total" marks that label's row; the last
+# such row of each is used, and nothing is written unless all three are
+# found, so blank or extra lines between Subtotal, GST 9% and Total are fine.
+AMOUNT_COLUMN = "I"
+FIRST_AMOUNT_ROW = 24
+LABELS = ("subtotal", "gst 9%", "total")
+
+
+def _label_of(text):
+    """The first of LABELS that *text* contains, or None."""
+    for label in LABELS:
+        if label in text:
+            return label
+    return None
+
+
+def find_label_rows(rows, columns=None):
+    """Return the last row of each of LABELS, or None if one is missing.
+
+    *columns* (a set of column numbers) limits where the labels are looked
+    for; by default every column is.
+    """
+    index = SheetText(rows, columns)
+    found = dict.fromkeys(LABELS)
+    for r, _, value in index.search(_label_of):
+        if isinstance(value, str):
+            label = _label_of(value.strip().lower())
+            found[label] = max(found[label] or 0, r)
+    if not all(found.values()):
+        return None
+    return [found[label] for label in LABELS]
+
+
+def plan_formulas(rows, columns=None):
+    """Return ``{coordinate: formula}`` for the Invoice sheet value *rows*, or None if a label is missing."""
+    found = find_label_rows(rows, columns)
+    if found is None:
+        return None
+    subtotal_row, gst_row, total_row = found
+    col = AMOUNT_COLUMN
+    amount = column_index_from_string(col)
+    formulas = {}
+    # Subtotal is only written when there is an amount above it
+    if any(len(row) >= amount and row[amount - 1] is not None for row in rows[:subtotal_row - 1]):
+        formulas[f"{col}{subtotal_row}"] = f"=SUM({col}{FIRST_AMOUNT_ROW}:{col}{subtotal_row - 1})"
+    formulas[f"{col}{gst_row}"] = f"={col}{subtotal_row}*0.09"
+    formulas[f"{col}{total_row}"] = f"=sum({col}{subtotal_row}:{col}{gst_row})"
+    return formulas
+
+
+def update_workbook(file_path, columns=None, sparse=True):
+    """Update the Subtotal, GST and Total formulas of one workbook; return its result record."""
+    result = {'file': file_path, 'formulas': None, 'saved': False, 'error': None}
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            names = [name for name in workbook.sheetnames if name.strip().lower() == "invoice"]
+            if not names:
+                result['error'] = "sheet 'Invoice' not found"
+                return result
+            sheet_name = names[0]
+            rows = list(workbook[sheet_name].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+        formulas = plan_formulas(rows, _columns(columns))
+        if formulas is None:
+            result['error'] = "Subtotal, GST 9% or Total row not found"
+            return result
+        result['formulas'] = formulas
+        changed = {}
+        for ref, formula in formulas.items():
+            r, c = coordinate_to_tuple(ref)
+            current = rows[r - 1][c - 1] if r <= len(rows) and c <= len(rows[r - 1]) else None
+            if current != formula:
+                changed[ref] = formula
+        result['saved'] = write_cells(file_path, {sheet_name: changed}, sparse)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    return result
+
+
+def update_Invoice_formulas(directory, jobs=1, columns=None):
+    start = time.perf_counter()
+    paths = [os.path.join(root, file) for root, _, files in os.walk(directory) for file in files
+             if file.lower().endswith(EXCEL_SUFFIXES) and not file.startswith('~$')]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            results = list(pool.map(update_workbook, paths, [columns] * len(paths)))
+    else:
+        results = [update_workbook(path, columns) for path in paths]
+    for r in results:
+        if r['error']:
+            print(f"Skipped {r['file']}: {r['error']}")
+        else:
+            status = 'Updated and saved' if r['saved'] else 'Unchanged'
+            print(f"{status}: {r['file']} ({', '.join(f'{k} {v}' for k, v in r['formulas'].items())})")
+    saved = sum(1 for r in results if r['saved'])
+    print(f"Saved {saved} of {len(results)} workbooks in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def main():
+    default_dir = r"C:\\Users\\User\\Dropbox\\DO & INV\\DO & INV 2025\\Melvin - MOS Burger\\For Customer\\MOS DOC (OTL) - Format"
+    parser = argparse.ArgumentParser(description="Rewrite the Subtotal, GST 9% and Total formulas of every Invoice sheet")
+    parser.add_argument('directory', nargs='?', default=default_dir)
+    parser.add_argument('-j', '--jobs', type=int, default=4, help='worker processes (0 = one per CPU)')
+    parser.add_argument('--columns', help='only look for the labels in these columns, e.g. H or G,H')
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    update_Invoice_formulas(args.directory, jobs, args.columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+批量设置 Excel 文件的活动工作表和选中单元格，不需要打开 Excel。
+
+Replaces the xlwings loops of ``unhideinvoice.py`` and ``mousemoving.py``,
+which started Excel and opened every workbook just to activate a sheet or
+move the selection. :func:`xlsx_patch.set_views` rewrites the views in the
+xlsx zip instead, so this runs anywhere, in parallel, and leaves workbooks
+whose views are already right untouched. Only ``.xlsx``/``.xlsm`` can be
+edited this way; ``.xls``/``.xlsb`` files are handed to a *legacy*
+callback (``mousemoving.py`` passes an xlwings fallback) or listed as
+skipped.
+
+    python sheet_views.py "C:\\...\\DO & INV 2025" --files xx25 --active DO --active Invoice -j 4
+    python sheet_views.py "C:\\...\\Format" --select DO=K11@A1 --select Invoice=I11@A1
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from workbook_rules import EXCEL_SUFFIXES
+from xlsx_patch import set_views
+
+LEGACY_SUFFIXES = ('.xls', '.xlsb')
+
+
+def apply_views(file_path, active=None, selections=None):
+    """Set the views of one workbook; return its result record."""
+    start = time.perf_counter()
+    result = {'file': file_path, 'active': None, 'selected': [], 'saved': False, 'seconds': 0.0, 'error': None}
+    try:
+        result['active'], result['selected'], result['saved'] = set_views(file_path, active, selections)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def find_workbooks(directory, files=None, recursive=True, suffixes=EXCEL_SUFFIXES):
+    """Yield the workbooks under *directory* whose names contain any of *files* (case-insensitive)."""
+    patterns = [p.lower() for p in files or []]
+    for root, _, names in os.walk(directory):
+        for name in names:
+            lower = name.lower()
+            if lower.endswith(suffixes) and not name.startswith('~$') and (
+                    not patterns or any(p in lower for p in patterns)):
+                yield os.path.join(root, name)
+        if not recursive:
+            break
+
+
+def run_views(directory, active=None, selections=None, files=None, jobs=1, recursive=True, report=None,
+              legacy=None):
+    """Apply :func:`xlsx_patch.set_views` to every matching workbook under *directory*.
+
+    Matching ``.xls``/``.xlsb`` files are passed to ``legacy(paths)`` if
+    given, otherwise each one is reported as skipped.
+    """
+    start = time.perf_counter()
+    paths = list(find_workbooks(directory, files, recursive))
+    legacy_paths = list(find_workbooks(directory, files, recursive, LEGACY_SUFFIXES))
+    print(f"[INFO] {len(paths)} workbooks" + (f", {len(legacy_paths)} .xls/.xlsb" if legacy_paths else ''))
+    if legacy_paths and legacy is not None:
+        legacy(legacy_paths)
+    elif legacy_paths:
+        for path in legacy_paths:
+            print(f"[SKIP] {path}: .xls/.xlsb cannot be edited without Excel")
+    results = []
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            futures = {pool.submit(apply_views, path, active, selections): path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'file': futures[future], 'active': None, 'selected': [], 'saved': False,
+                                    'seconds': 0.0, 'error': f"{type(e).__name__}: {e}"})
+                _print_result(results[-1])
+    else:
+        for path in paths:
+            results.append(apply_views(path, active, selections))
+            _print_result(results[-1])
+
+    elapsed = time.perf_counter() - start
+    saved = sum(1 for r in results if r['saved'])
+    skipped = sum(1 for r in results if not r['error'] and r['active'] is None and not r['selected'])
+    errors = [r for r in results if r['error']]
+    if legacy is None:
+        skipped += len(legacy_paths)
+    print(f"✅ 处理完成，共修改 {saved} 个文件，跳过 {skipped} 个文件，用时 {elapsed:.1f}s。")
+    if errors:
+        print("⚠️ 以下文件处理失败：")
+        for r in errors:
+            print(f"  ❌ {r['file']}: {r['error']}")
+    if report:
+        with open(report, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed_s': round(elapsed, 3), 'files': results}, f, ensure_ascii=False, indent=1)
+    return results
+
+
+def _print_result(result):
+    if result['error']:
+        print(f"[ERROR] {result['file']}: {result['error']}")
+    elif result['active'] is None and not result['selected']:
+        print(f"[INFO] {result['file']}: skipped (no matching sheets)")
+    else:
+        status = 'saved' if result['saved'] else 'unchanged'
+        print(f"[INFO] {result['file']}: {status} (active {result['active'] or '-'}, "
+              f"selected {', '.join(result['selected']) or '-'}, {result['seconds']:.2f}s)")
+
+
+def _parse_select(text):
+    """``SHEET=CELL`` or ``SHEET=CELL@TOPLEFT`` -> ``(sheet, (cell, top_left))``."""
+    sheet, _, cell = text.rpartition('=')
+    if not sheet or not cell:
+        raise argparse.ArgumentTypeError(f"expected SHEET=CELL[@TOPLEFT], got {text!r}")
+    cell, _, top_left = cell.partition('@')
+    return sheet, (cell.upper(), top_left.upper() or None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set the active sheet and selection of every workbook in a folder")
+    parser.add_argument('directory')
+    parser.add_argument('--active', action='append',
+                        help='sheet to activate; repeat to give fallbacks in order of preference')
+    parser.add_argument('--select', action='append', type=_parse_select, default=[],
+                        help='SHEET=CELL[@TOPLEFT], e.g. DO=K11@A1 (repeatable)')
+    parser.add_argument('--files', action='append', help='file name substring, any of them (repeatable)')
+    parser.add_argument('--no-recursive', action='store_true', help='only the workbooks directly in DIRECTORY')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes (0 = one per CPU)')
+    parser.add_argument('--report', help='write per-file results to this JSON file')
+    args = parser.parse_args()
+    if not args.active and not args.select:
+        parser.error('nothing to do: give --active and/or --select')
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    run_views(args.directory, args.active, dict(args.select), args.files, jobs,
+              not args.no_recursive, args.report)
+
+
+if __name__ == '__main__':
+    main()
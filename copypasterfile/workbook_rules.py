@@ -0,0 +1,444 @@
+"""
+按规则批量修改 DO & INV 目录下的 Excel 文件。
+
+Declarative replacement for the one-off ``os.walk`` + ``load_workbook`` +
+``iter_rows`` scripts in this folder. A rule is a plain dict (so rule sets
+can live in JSON files):
+
+    {
+        "name": "honey mustard (DO)",          # used in the hit counts
+        "files": ["xx25"],                     # file name substrings, any of them; default all
+        "sheets": ["DO"],                      # sheet names (case-insensitive); default all
+        "columns": ["C"],                      # where to look for the match; default all
+        "match": {"contains": "honey mustard sauce"},
+        "set": {"B": "SD2136", "I": "=7.5*G{row}"},
+    }
+
+``match`` is one of ``text`` (the whole stripped, lower-cased cell text),
+``contains`` / ``regex`` (tested on that text), ``equals`` (the raw cell
+value), or omitted to hit every cell of the sheet; ``"case_sensitive": true``
+makes ``text`` / ``contains`` / ``regex`` test the text as written, for
+rules whose ``replace`` is case-sensitive anyway. Matches are looked up
+in a :class:`SheetText` index built once per sheet from the values as
+loaded, so ``text`` and ``equals`` cost a dict lookup per rule and
+``contains`` / ``regex`` one test per distinct text. ``columns`` (or
+``--columns`` for all rules) limits the index to the given columns. On a
+hit the actions run in this order:
+
+* ``set``: ``{column: value}`` written to the hit's row; ``{row}``,
+  ``{row-1}``, ``{row+2}`` … in string values become row numbers;
+* ``value``: new value of the hit cell;
+* ``replace``: ``{old: new}`` substring replacements in the hit cell;
+* ``fill``: fill colour of the hit cell (``None`` removes the fill);
+* ``copy_style_down``: ``{"column": "C", "while_in": [...]}`` copies the
+  hit row's cell styles to the rows below for as long as that column's text
+  is one of *while_in*.
+
+All rules are applied in one pass per workbook: every workbook is loaded
+once, the hits of all rules are applied in sheet order, and the workbook
+is saved only if something changed. Rule
+sets that only write values (no ``fill`` or ``copy_style_down``) are
+matched in a read-only pass and written with :mod:`xlsx_patch`, which
+leaves the rest of the file untouched.
+Workbooks are processed in parallel and hits are counted per rule.
+
+    python workbook_rules.py "C:\\...\\DO & INV 2025" --rules rules.json -j 4
+"""
+import argparse
+import json
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import openpyxl
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from cell_styles import StyleCache, copy_row_format, solid_fill
+from xlsx_patch import PatchError, patch_cells
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+_ROW_REF = re.compile(r"\{row([+-]\d+)?\}")
+
+
+def _row_template(value):
+    """Return ``f(row)`` producing *value* with its ``{row±n}`` references filled in."""
+    if not isinstance(value, str) or not _ROW_REF.search(value):
+        return lambda row: value
+    return lambda row: _ROW_REF.sub(lambda m: str(row + int(m.group(1) or 0)), value)
+
+
+def _columns(columns):
+    """``['B', 'C']`` or ``'B,C'`` -> ``{2, 3}``; None stays None (every column)."""
+    if not columns:
+        return None
+    if isinstance(columns, str):
+        columns = columns.split(',')
+    return {column_index_from_string(col.strip().upper()) for col in columns}
+
+
+def _text(value):
+    return str(value).strip().lower()
+
+
+class SheetText:
+    """Where each normalised cell text of a sheet occurs.
+
+    Built once per sheet from its value rows, limited to *columns* if
+    given: ``{stripped lower-cased text: [(row, column, value), ...]}``.
+    Exact lookups are dict lookups; substring and regex searches test each
+    distinct text once instead of every cell.
+    """
+
+    def __init__(self, rows, columns=None):
+        self.cells = {}
+        for r, row in enumerate(rows, 1):
+            for c in sorted(columns) if columns else range(1, len(row) + 1):
+                if c <= len(row) and row[c - 1] is not None:
+                    value = row[c - 1]
+                    self.cells.setdefault(_text(value), []).append((r, c, value))
+
+    def get(self, text):
+        return self.cells.get(text, [])
+
+    def get_value(self, value):
+        """Cells whose text could be that of *value* (``2024`` also finds ``2024.0``)."""
+        keys = {_text(value)}
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer():
+            keys |= {str(int(value)), str(float(value))}
+        return [hit for key in keys for hit in self.get(key)]
+
+    def search(self, predicate):
+        return [hit for text, hits in self.cells.items() if predicate(text) for hit in hits]
+
+
+class Rule:
+    """One compiled rule dict; see the module docstring for the keys."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.get('name') or json.dumps(spec.get('match'), ensure_ascii=False)
+        self.files = [f.lower() for f in spec.get('files', [])]
+        self.sheets = {s.strip().lower() for s in spec['sheets']} if spec.get('sheets') else None
+
+        self.columns = _columns(spec.get('columns'))
+        match = spec.get('match') or {}
+        if 'text' in match:
+            needle = match['text'].strip().lower()
+            self.find = lambda index: index.get(needle)
+        elif 'contains' in match:
+            needle = match['contains'].strip().lower()
+            self.find = lambda index: index.search(lambda text: needle in text)
+        elif 'regex' in match:
+            pattern = re.compile(match['regex'])
+            self.find = lambda index: index.search(lambda text: pattern.search(text) is not None)
+        elif 'equals' in match:
+            expected = match['equals']
+            self.find = lambda index: [(r, c, v) for r, c, v in index.get_value(expected) if v == expected]
+        else:
+            self.find = None
+        if match.get('case_sensitive') and 'regex' in match:
+            pattern = re.compile(match['regex'])
+            self.find = lambda index: [hit for hits in index.cells.values() for hit in hits
+                                       if pattern.search(str(hit[2]).strip()) is not None]
+        elif match.get('case_sensitive') and 'text' in match:
+            # The index is lower-cased, so narrow its hits down by the cell text as written
+            exact, find = match['text'].strip(), self.find
+            self.find = lambda index: [hit for hit in find(index) if str(hit[2]).strip() == exact]
+        elif match.get('case_sensitive') and 'contains' in match:
+            part, find = match['contains'].strip(), self.find
+            self.find = lambda index: [hit for hit in find(index) if part in str(hit[2])]
+
+        self.set = [(column_index_from_string(col), _row_template(v)) for col, v in spec.get('set', {}).items()]
+        self.has_value = 'value' in spec
+        self.value = spec.get('value')
+        self.replace = list(spec.get('replace', {}).items())
+        self.has_fill = 'fill' in spec
+        if self.has_fill:
+            self.fill = solid_fill(spec['fill'])
+        style_down = spec.get('copy_style_down')
+        if style_down:
+            self.style_column = column_index_from_string(style_down['column'])
+            self.style_while = {s.strip().lower() for s in style_down['while_in']}
+        else:
+            self.style_column = None
+
+    def wants_file(self, file_name):
+        name = file_name.lower()
+        return not self.files or any(f in name for f in self.files)
+
+    def wants_sheet(self, sheet_name):
+        return self.sheets is None or sheet_name.strip().lower() in self.sheets
+
+    @property
+    def values_only(self):
+        """True if the rule only writes values, so a workbook can be patched sparsely."""
+        return not self.has_fill and self.style_column is None
+
+    def value_writes(self, row, col, get):
+        """Yield ``(column, value)`` writes for a hit at (*row*, *col*).
+
+        ``get(column)`` returns the current value in *row*; each write must
+        be applied before the next one is requested.
+        """
+        for target, make in self.set:
+            value = make(row)
+            if get(target) != value:
+                yield target, value
+        if self.has_value and get(col) != self.value:
+            yield col, self.value
+        current = get(col)
+        if self.replace and isinstance(current, str):
+            new = current
+            for old, repl in self.replace:
+                new = new.replace(old, repl)
+            if new != current:
+                yield col, new
+
+    def apply(self, sheet, cell, styles):
+        """Run the actions for a hit on *cell*; return True if the sheet changed.
+
+        *styles* is the :class:`cell_styles.StyleCache` of the workbook.
+        """
+        changed = False
+        row = cell.row
+        for col, value in self.value_writes(row, cell.column, lambda c: sheet.cell(row=row, column=c).value):
+            sheet.cell(row=row, column=col).value = value
+            changed = True
+        if self.has_fill:
+            changed = styles.restyle(cell, fill=self.fill) or changed
+        if self.style_column is not None:
+            changed = self._copy_style_down(sheet, row) or changed
+        return changed
+
+    def _copy_style_down(self, sheet, row):
+        end = row + 1
+        while end <= sheet.max_row:
+            text = sheet.cell(row=end, column=self.style_column).value
+            if not isinstance(text, str) or text.strip().lower() not in self.style_while:
+                break
+            end += 1
+        return copy_row_format(sheet, row, range(row + 1, end)) > 0
+
+
+def _hits(rows, rules, columns=None):
+    """Return ``(row, column, rule)`` for every hit of *rules* in *rows*, in sheet order.
+
+    *rows* is a list of value tuples; *columns* limits the text index.
+    Within a cell, rules that hit every cell come first, then the others in
+    rule order.
+    """
+    events = []
+    tested = [(i, rule) for i, rule in enumerate(rules) if rule.find is not None]
+    if tested:
+        if columns is None and all(rule.columns for _, rule in tested):
+            columns = set().union(*(rule.columns for _, rule in tested))
+        index = SheetText(rows, columns)
+        for i, rule in tested:
+            events.extend((r, c, 1, i) for r, c, _ in rule.find(index)
+                          if rule.columns is None or c in rule.columns)
+    every_cell = [i for i, rule in enumerate(rules) if rule.find is None]
+    if every_cell:
+        events.extend((r, c, 0, i) for r, row in enumerate(rows, 1)
+                      for c in range(1, len(row) + 1) for i in every_cell)
+    events.sort()
+    return [(r, c, rules[i]) for r, c, _, i in events]
+
+
+def _apply_sheet(sheet, rules, hits, styles, columns=None):
+    changed = False
+    for r, c, rule in _hits(list(sheet.iter_rows(values_only=True)), rules, columns):
+        hits[rule.name] += 1
+        changed = rule.apply(sheet, sheet.cell(row=r, column=c), styles) or changed
+    return changed
+
+
+def _plan_sheet(rows, rules, hits, columns=None):
+    """Read-only counterpart of :func:`_apply_sheet`; return ``{(row, column): value}`` to write."""
+    rows = list(rows)
+    pending = {}
+    for r, c, rule in _hits(rows, rules, columns):
+        row = rows[r - 1]
+
+        def get(col, r=r, row=row):
+            return pending.get((r, col), row[col - 1] if col <= len(row) else None)
+
+        hits[rule.name] += 1
+        for col, value in rule.value_writes(r, c, get):
+            pending[(r, col)] = value
+    return pending
+
+
+def _apply_sparse(file_path, rules, hits, columns=None):
+    """Match in a read-only pass and write the changed cells with :func:`xlsx_patch.patch_cells`."""
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        edits = {}
+        for sheet_name in workbook.sheetnames:
+            sheet_rules = [rule for rule in rules if rule.wants_sheet(sheet_name)]
+            if sheet_rules:
+                pending = _plan_sheet(workbook[sheet_name].iter_rows(values_only=True), sheet_rules, hits, columns)
+                edits[sheet_name] = {f"{get_column_letter(c)}{r}": v for (r, c), v in sorted(pending.items())}
+    finally:
+        workbook.close()
+    return patch_cells(file_path, edits) > 0
+
+
+def write_cells(file_path, edits, sparse=True):
+    """Write ``{sheet name: {coordinate: value}}`` into one workbook; return True if it was saved.
+
+    For scripts that find their cells themselves. The cells are patched in
+    place (*sparse*), or written with an openpyxl load/save if that is not
+    possible.
+    """
+    edits = {sheet: cells for sheet, cells in edits.items() if cells}
+    if not edits:
+        return False
+    if sparse:
+        try:
+            return patch_cells(file_path, edits) > 0
+        except PatchError as e:
+            print(f"[INFO] {file_path}: {e}, using openpyxl")
+    workbook = openpyxl.load_workbook(file_path, keep_vba=file_path.lower().endswith('.xlsm'))
+    try:
+        for sheet_name, cells in edits.items():
+            for ref, value in cells.items():
+                workbook[sheet_name][ref] = value
+        workbook.save(file_path)
+    finally:
+        workbook.close()
+    return True
+
+
+def apply_rules(file_path, specs, sparse=True, columns=None):
+    """Apply the rule dicts *specs* to one workbook; return its result record.
+
+    *columns* (``'B,C'`` or a list of letters) limits where every rule looks
+    for its match.
+
+    When every rule only writes values, the workbook is scanned read-only
+    and patched in place (*sparse*); otherwise, or if the patch is not
+    possible, it is loaded and saved with openpyxl.
+    """
+    start = time.perf_counter()
+    rules = [Rule(spec) for spec in specs]
+    columns = _columns(columns)
+    hits = Counter({rule.name: 0 for rule in rules})
+    result = {'file': file_path, 'hits': hits, 'saved': False, 'seconds': 0.0, 'error': None}
+    if sparse and all(rule.values_only for rule in rules):
+        sparse_hits = Counter(hits)
+        try:
+            result['saved'] = _apply_sparse(file_path, rules, sparse_hits, columns)
+            result['hits'] = sparse_hits
+            result['seconds'] = round(time.perf_counter() - start, 3)
+            return result
+        except PatchError as e:
+            print(f"[INFO] {file_path}: {e}, using openpyxl")
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+            result['seconds'] = round(time.perf_counter() - start, 3)
+            return result
+    workbook = None
+    try:
+        workbook = openpyxl.load_workbook(file_path, keep_vba=file_path.lower().endswith('.xlsm'))
+        styles = StyleCache(workbook)
+        changed = False
+        for sheet_name in workbook.sheetnames:
+            sheet_rules = [rule for rule in rules if rule.wants_sheet(sheet_name)]
+            if sheet_rules:
+                changed = _apply_sheet(workbook[sheet_name], sheet_rules, hits, styles, columns) or changed
+        if changed:
+            workbook.save(file_path)
+            result['saved'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    finally:
+        if workbook is not None:
+            workbook.close()
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def find_workbooks(directory, specs):
+    """Walk *directory* once; yield ``(path, [specs that apply to it])``."""
+    rules = [Rule(spec) for spec in specs]
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if not file.lower().endswith(EXCEL_SUFFIXES) or file.startswith('~$'):
+                continue
+            wanted = [spec for spec, rule in zip(specs, rules) if rule.wants_file(file)]
+            if wanted:
+                yield os.path.join(root, file), wanted
+
+
+def run_rules(directory, specs, jobs=1, report=None, sparse=True, columns=None):
+    """Apply *specs* to every matching workbook under *directory*; print per-rule hits."""
+    start = time.perf_counter()
+    tasks = list(find_workbooks(directory, specs))
+    print(f"[INFO] {len(tasks)} workbooks, {len(specs)} rules")
+    results = []
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            futures = {pool.submit(apply_rules, path, wanted, sparse, columns): path for path, wanted in tasks}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'file': futures[future], 'hits': Counter(), 'saved': False,
+                                    'seconds': 0.0, 'error': f"{type(e).__name__}: {e}"})
+                _print_result(results[-1])
+    else:
+        for path, wanted in tasks:
+            results.append(apply_rules(path, wanted, sparse, columns))
+            _print_result(results[-1])
+
+    totals = Counter({Rule(spec).name: 0 for spec in specs})
+    for r in results:
+        totals.update(r['hits'])
+    elapsed = time.perf_counter() - start
+    print("\n========== Summary ==========")
+    for name, count in totals.items():
+        print(f"{count:8d}  {name}")
+    saved = sum(1 for r in results if r['saved'])
+    errors = [r for r in results if r['error']]
+    print(f"Saved {saved} of {len(results)} workbooks in {elapsed:.1f}s")
+    if errors:
+        print("⚠️ 以下文件处理失败：")
+        for r in errors:
+            print(f"  ❌ {r['file']}: {r['error']}")
+    if report:
+        with open(report, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed_s': round(elapsed, 3), 'rules': totals, 'files': results},
+                      f, ensure_ascii=False, indent=1)
+    return results
+
+
+def _print_result(result):
+    if result['error']:
+        print(f"[ERROR] {result['file']}: {result['error']}")
+        return
+    hits = ', '.join(f"{name}: {n}" for name, n in result['hits'].items() if n)
+    status = 'saved' if result['saved'] else 'unchanged'
+    print(f"[INFO] {result['file']}: {status} ({hits or 'no hits'}, {result['seconds']:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a JSON list of cell rules to every workbook in a folder")
+    parser.add_argument('directory')
+    parser.add_argument('--rules', required=True, help='JSON file with a list of rules')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes (0 = one per CPU)')
+    parser.add_argument('--report', help='write per-file and per-rule counts to this JSON file')
+    parser.add_argument('--no-sparse', action='store_true', help='always load and save with openpyxl')
+    parser.add_argument('--columns', help='only look for matches in these columns, e.g. C or B,C')
+    args = parser.parse_args()
+    with open(args.rules, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    run_rules(args.directory, specs, jobs, args.report, not args.no_sparse, args.columns)
+
+
+if __name__ == '__main__':
+    main()
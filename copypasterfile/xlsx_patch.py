@@ -0,0 +1,504 @@
+"""
+直接修改 xlsx 压缩包里的单元格，不经过 openpyxl 的完整读写。
+
+``patch_cells`` writes a handful of cell values into an ``.xlsx``/``.xlsm``
+by splicing the affected ``<c>`` elements of ``xl/worksheets/sheetN.xml``
+(and appending to ``xl/sharedStrings.xml``) in a single forward pass over
+each edited part. Every other part is copied unchanged, so charts, images,
+VBA, data validation and anything else openpyxl would drop or rewrite stay
+exactly as Excel saved them. The cost of an edit is roughly the cost of
+copying the file.
+
+Values follow openpyxl: a string starting with ``=`` is a formula, other
+strings become shared strings, numbers and booleans are written as such and
+``None`` clears the value. The cell keeps its style. When a formula cell
+is written or overwritten, ``fullCalcOnLoad`` is set so Excel recalculates
+on open and ``calcChain.xml`` is dropped, as openpyxl does.
+
+Anything that cannot be patched safely raises :class:`PatchError`, so
+callers can fall back to openpyxl: the master cell of a shared or array
+formula, a sheet whose cells have no ``r`` attribute, NaN or infinite
+numbers, and parts written with single-quoted attributes or a namespace
+prefix on the spreadsheet elements (``<x:c>``), which the patterns here
+do not read.
+
+Untouched members are copied without recompressing them. That relies on
+``zipfile`` internals, so it is only done on the CPython versions it was
+checked against; elsewhere members are decompressed and written again.
+
+``set_views`` does the same for the active tab and the selected cell of
+each sheet (``workbookView``/``sheetView``/``selection``), which is all
+the xlwings scripts here opened Excel for.
+"""
+import math
+import os
+import posixpath
+import re
+import shutil
+import struct
+import sys
+import zipfile
+from copy import copy
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, unescape
+
+from openpyxl.utils import column_index_from_string, coordinate_to_tuple, get_column_letter
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_ROW = re.compile(r'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+_CELL = re.compile(r'<c\b[^>]*?(?:/>|>.*?</c>)', re.S)
+_ATTR = re.compile(r'\s([\w:]+)="([^"]*)"')
+# What the patterns here cannot read: single-quoted attributes and
+# prefixed spreadsheet elements (<x:c>, <x:row>, ...). Both searches start
+# at a character that is rare in these parts; _read_xml checks each hit.
+_SINGLE_QUOTED = re.compile(r"=\s*'")
+_PREFIXED = re.compile(r'<[\w.-]+:(?:workbook|worksheet|sst|sheetData|row|c|si|calcPr|sheet)[\s/>]')
+_PREFIXED_HINT = re.compile(r':(?:workbook|worksheet|sst|sheetData|row|c|si|calcPr|sheet)[\s/>]')
+_SHEET_DATA = re.compile(r'<sheetData\s*/>|<sheetData\b[^>]*>(.*?)</sheetData>', re.S)
+_SST = re.compile(r'<sst\b([^>]*?)(/?)>')
+_SI = re.compile(r'<si>(.*?)</si>', re.S)
+_PLAIN_T = re.compile(r'^<t(?: xml:space="preserve")?>([^<]*)</t>$')
+_DIMENSION = re.compile(r'<dimension\s+ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+_SHEET = re.compile(r'<sheet\b[^>]*?/?>')
+_WORKBOOK_VIEW = re.compile(r'<workbookView\b[^>]*?/?>')
+_SHEET_VIEW = re.compile(r'<sheetView\b[^>]*?(?:/>|>.*?</sheetView>)', re.S)
+_SELECTION = re.compile(r'<selection\b[^>]*?/>')
+# Elements that may follow sheetViews in CT_Worksheet, for inserting a missing one.
+_BEFORE_SHEET_VIEWS = re.compile(r'<(?:sheetFormatPr|cols|sheetData)\b')
+_CALC_PR = re.compile(r'<calcPr\b[^>]*?/?>')
+# Elements that follow calcPr in CT_Workbook, for inserting a missing one.
+_AFTER_CALC_PR = re.compile(
+    r'<(?:oleSize|customWorkbookViews|pivotCaches|smartTagPr|smartTagTypes|webPublishing|'
+    r'fileRecoveryPr|webPublishObjects|extLst)\b|</workbook>')
+
+
+class PatchError(Exception):
+    """The requested edit cannot be done without a full load."""
+
+
+# _copy_raw writes to zipfile internals (filelist, NameToInfo, start_dir,
+# _didModify); it was checked against CPython 3.8 to 3.13.
+_RAW_COPY = sys.implementation.name == 'cpython' and (3, 8) <= sys.version_info[:2] <= (3, 13)
+_ZIP_INTERNALS = ('filelist', 'NameToInfo', 'start_dir', '_didModify')
+
+
+def _read_xml(zin, part):
+    """Return part *part* of *zin* as text, or raise PatchError if it cannot be patched."""
+    xml = zin.read(part).decode('utf-8')
+    for m in _SINGLE_QUOTED.finditer(xml):
+        # Inside a tag (not text) and not the XML declaration
+        tag_start = xml.rfind('<', 0, m.start())
+        if tag_start > xml.rfind('>', 0, m.start()) and xml[tag_start + 1] != '?':
+            raise PatchError(f"{part} uses single-quoted attributes")
+    for m in _PREFIXED_HINT.finditer(xml):
+        tag_start = xml.rfind('<', 0, m.start())
+        if _PREFIXED.match(xml, tag_start):
+            raise PatchError(f"{part} uses prefixed spreadsheet elements")
+    return xml
+
+
+def _attrs(tag):
+    return dict(_ATTR.findall(tag[:tag.index('>') + 1]))
+
+
+def _col(coordinate):
+    return column_index_from_string(re.match(r'[A-Z]+', coordinate).group())
+
+
+def sheet_parts(zin):
+    """Return ``{sheet name: zip part name}`` from the workbook and its relationships."""
+    workbook = ElementTree.fromstring(zin.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(zin.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{_NS_PKG_REL}Relationship'):
+        target = rel.get('Target')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else posixpath.normpath(
+            posixpath.join('xl', target))
+    return {
+        sheet.get('name'): targets[sheet.get(f'{_NS_REL}id')]
+        for sheet in workbook.iter(f'{_NS_MAIN}sheet')
+    }
+
+
+class _SharedStrings:
+    """Append-only view of ``xl/sharedStrings.xml``."""
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.index = {}
+        self.count = 0
+        for i, m in enumerate(_SI.finditer(xml)):
+            plain = _PLAIN_T.match(m.group(1))
+            if plain:
+                self.index.setdefault(unescape(plain.group(1)), i)
+            self.count = i + 1
+        self.new = []
+        self.refs = 0
+
+    def add(self, text):
+        self.refs += 1
+        if text not in self.index:
+            self.index[text] = self.count + len(self.new)
+            self.new.append(text)
+        return self.index[text]
+
+    def serialize(self):
+        if not self.new and not self.refs:
+            return self.xml
+        m = _SST.search(self.xml)
+        old_total = re.search(r'\scount="(\d+)"', m.group(1))
+        total = max(0, (int(old_total.group(1)) if old_total else self.count) + self.refs)
+        attrs = re.sub(r'\s(?:count|uniqueCount)="\d*"', '', m.group(1))
+        head = f'<sst{attrs} count="{total}" uniqueCount="{self.count + len(self.new)}">'
+        items = ''.join(f'<si><t xml:space="preserve">{escape(t)}</t></si>' for t in self.new)
+        if m.group(2):
+            return self.xml[:m.start()] + head + items + '</sst>' + self.xml[m.end():]
+        end = self.xml.rindex('</sst>')
+        return self.xml[:m.start()] + head + self.xml[m.end():end] + items + self.xml[end:]
+
+
+def _cell_xml(ref, style, value, strings):
+    s = f' s="{style}"' if style else ''
+    if value is None:
+        return f'<c r="{ref}"{s}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, float) and not math.isfinite(value):
+        raise PatchError(f"cannot write {value!r} to {ref}")
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{s}><v>{value!r}</v></c>'
+    if not isinstance(value, str):
+        raise PatchError(f"cannot write a {type(value).__name__} value")
+    if value.startswith('=') and len(value) > 1:
+        return f'<c r="{ref}"{s}><f>{escape(value[1:])}</f></c>'
+    if strings is not None:
+        return f'<c r="{ref}"{s} t="s"><v>{strings.add(value)}</v></c>'
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+
+
+def _patch_row(row_xml, row_no, cells, strings, touched):
+    """Return *row_xml* with *cells* (``{column: (ref, value)}``) written."""
+    if row_xml.endswith('/>'):
+        open_tag, inner, close = row_xml[:-2] + '>', '', '</row>'
+    else:
+        open_tag = row_xml[:row_xml.index('>') + 1]
+        inner, close = row_xml[len(open_tag):-len('</row>')], '</row>'
+    pending = dict(cells)
+    out = []
+    pos = 0
+    inserted = False
+    for m in _CELL.finditer(inner):
+        cell = m.group()
+        attrs = _attrs(cell)
+        ref = attrs.get('r')
+        if ref is None:
+            raise PatchError(f"row {row_no} has cells without a reference")
+        col = _col(ref)
+        for c in sorted(c for c in list(pending) if c < col):
+            new_ref, value = pending.pop(c)
+            out.append(inner[pos:m.start()])
+            pos = m.start()
+            out.append(_cell_xml(new_ref, None, value, strings))
+            inserted = True
+        if col in pending:
+            new_ref, value = pending.pop(col)
+            if '<f' in cell:
+                f_attrs = _attrs(cell[cell.index('<f'):])
+                if f_attrs.get('t') in ('shared', 'array') and 'ref' in f_attrs:
+                    raise PatchError(f"{ref} is the master cell of a {f_attrs['t']} formula")
+                touched['formula'] = True
+            if attrs.get('t') == 's' and strings is not None:
+                strings.refs -= 1
+            out.append(inner[pos:m.start()])
+            out.append(_cell_xml(ref, attrs.get('s'), value, strings))
+            pos = m.end()
+    out.append(inner[pos:])
+    for c in sorted(pending):
+        new_ref, value = pending[c]
+        out.append(_cell_xml(new_ref, None, value, strings))
+        inserted = True
+    if inserted:
+        # spans is only an optimisation hint and may no longer cover the row
+        open_tag = re.sub(r'\sspans="[^"]*"', '', open_tag)
+    return open_tag + ''.join(out) + close
+
+
+def _patch_sheet(xml, edits, strings, touched):
+    """Return sheet *xml* with *edits* (``{coordinate: value}``) applied."""
+    by_row = {}
+    for ref, value in edits.items():
+        row_no, col = coordinate_to_tuple(ref)
+        by_row.setdefault(row_no, {})[col] = (ref, value)
+        if isinstance(value, str) and value.startswith('='):
+            touched['formula'] = True
+
+    m = _SHEET_DATA.search(xml)
+    if m is None:
+        raise PatchError("sheet has no sheetData")
+    inner = m.group(1) or ''
+    out = []
+    pos = 0
+    for row_m in _ROW.finditer(inner):
+        row_xml = row_m.group()
+        r = _attrs(row_xml).get('r')
+        if r is None:
+            raise PatchError("sheet has rows without a row number")
+        row_no = int(r)
+        for missing in sorted(n for n in by_row if n < row_no):
+            out.append(inner[pos:row_m.start()])
+            pos = row_m.start()
+            out.append(_patch_row(f'<row r="{missing}"/>', missing, by_row.pop(missing), strings, touched))
+        if row_no in by_row:
+            out.append(inner[pos:row_m.start()])
+            out.append(_patch_row(row_xml, row_no, by_row.pop(row_no), strings, touched))
+            pos = row_m.end()
+    out.append(inner[pos:])
+    for missing in sorted(by_row):
+        out.append(_patch_row(f'<row r="{missing}"/>', missing, by_row[missing], strings, touched))
+    xml = xml[:m.start()] + '<sheetData>' + ''.join(out) + '</sheetData>' + xml[m.end():]
+    return _grow_dimension(xml, [coordinate_to_tuple(ref) for ref, value in edits.items() if value is not None])
+
+
+def _grow_dimension(xml, cells):
+    # Read-only readers (openpyxl included) size rows from <dimension>, so
+    # cells written outside it would not be read back.
+    m = _DIMENSION.search(xml)
+    if m is None or not cells:
+        return xml
+    first_col, first_row, last_col, last_row = m.groups()
+    rows = [int(first_row), int(last_row or first_row)] + [r for r, _ in cells]
+    cols = [column_index_from_string(first_col),
+            column_index_from_string(last_col or first_col)] + [c for _, c in cells]
+    ref = f'{get_column_letter(min(cols))}{min(rows)}:{get_column_letter(max(cols))}{max(rows)}'
+    return xml[:m.start()] + f'<dimension ref="{ref}"' + xml[m.end():]
+
+
+def _full_calc_on_load(xml):
+    m = _CALC_PR.search(xml)
+    if m:
+        tag = re.sub(r'\sfullCalcOnLoad="[^"]*"', '', m.group())
+        tag = tag[:-2].rstrip() + ' fullCalcOnLoad="1"/>' if tag.endswith('/>') else tag[:-1] + ' fullCalcOnLoad="1">'
+        return xml[:m.start()] + tag + xml[m.end():]
+    m = _AFTER_CALC_PR.search(xml)
+    return xml[:m.start()] + '<calcPr fullCalcOnLoad="1"/>' + xml[m.start():]
+
+
+def _copy_raw(zin, zout, info):
+    """Append member *info* of *zin* to *zout* without decompressing it; return False if it can't be."""
+    if not _RAW_COPY or not all(hasattr(zout, name) for name in _ZIP_INTERNALS):
+        return False
+    if info.flag_bits & 0x01 or max(info.file_size, info.compress_size, zout.fp.tell()) >= zipfile.ZIP64_LIMIT:
+        return False
+    zin.fp.seek(info.header_offset)
+    fixed = zin.fp.read(30)
+    if fixed[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack('<HH', fixed[26:30])
+    zin.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    data = zin.fp.read(info.compress_size)
+    out = copy(info)
+    out.flag_bits &= ~0x08  # sizes go in the local header, no data descriptor
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader(False))
+    zout.fp.write(data)
+    # What ZipFile.writestr records, so close() writes the central directory
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+    return True
+
+
+def _write_copy(zin, tmp_path, replaced, dropped=()):
+    """Copy *zin* to *tmp_path* with the *replaced* parts swapped in and *dropped* left out.
+
+    Untouched members are copied compressed, byte for byte, where
+    :func:`_copy_raw` can; otherwise they are streamed through ``zipfile``.
+    """
+    try:
+        with zipfile.ZipFile(tmp_path, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in dropped:
+                    continue
+                data = replaced.get(info.filename)
+                if data is not None:
+                    zout.writestr(info, data)
+                elif not _copy_raw(zin, zout, info):
+                    with zin.open(info) as src, zout.open(copy(info), 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def patch_cells(path, edits, out_path=None):
+    """Write *edits* (``{sheet name: {coordinate: value}}``) into the workbook at *path*.
+
+    The result replaces *path* (or is written to *out_path*) atomically.
+    Returns the number of cells written.
+    """
+    edits = {sheet: cells for sheet, cells in edits.items() if cells}
+    if not edits:
+        return 0
+    out_path = out_path or path
+    tmp_path = out_path + '.patch.tmp'
+    touched = {'formula': False}
+    with zipfile.ZipFile(path) as zin:
+        parts = sheet_parts(zin)
+        missing = set(edits) - set(parts)
+        if missing:
+            raise PatchError(f"sheets not found: {', '.join(sorted(missing))}")
+        names = set(zin.namelist())
+        strings = None
+        if 'xl/sharedStrings.xml' in names:
+            strings = _SharedStrings(_read_xml(zin, 'xl/sharedStrings.xml'))
+        replaced = {}
+        for sheet, cells in edits.items():
+            part = parts[sheet]
+            replaced[part] = _patch_sheet(_read_xml(zin, part), cells, strings, touched).encode('utf-8')
+        if strings is not None:
+            replaced['xl/sharedStrings.xml'] = strings.serialize().encode('utf-8')
+        dropped = set()
+        if touched['formula']:
+            replaced['xl/workbook.xml'] = _full_calc_on_load(_read_xml(zin, 'xl/workbook.xml')).encode('utf-8')
+        if touched['formula'] and 'xl/calcChain.xml' in names:
+            dropped.add('xl/calcChain.xml')
+            rels = zin.read('xl/_rels/workbook.xml.rels').decode('utf-8')
+            replaced['xl/_rels/workbook.xml.rels'] = re.sub(
+                r'<Relationship\b[^>]*calcChain[^>]*/>', '', rels).encode('utf-8')
+            types = zin.read('[Content_Types].xml').decode('utf-8')
+            replaced['[Content_Types].xml'] = re.sub(
+                r'<Override\b[^>]*calcChain[^>]*/>', '', types).encode('utf-8')
+
+        _write_copy(zin, tmp_path, replaced, dropped)
+    os.replace(tmp_path, out_path)
+    return sum(len(cells) for cells in edits.values())
+
+
+def _set_attr(tag, name, value):
+    """Return the opening *tag* with attribute *name* set to *value* (removed if None)."""
+    tag = re.sub(rf'\s{name}="[^"]*"', '', tag)
+    if value is None:
+        return tag
+    end = -2 if tag.endswith('/>') else -1
+    return tag[:end].rstrip() + f' {name}="{value}"' + tag[end:]
+
+
+def _split_element(xml):
+    """Split an element into ``(opening tag, body, closing tag)``; self-closing ones get a body."""
+    if xml.endswith('/>'):
+        name = re.match(r'<([\w:]+)', xml).group(1)
+        return xml[:-2].rstrip() + '>', '', f'</{name}>'
+    open_end = xml.index('>') + 1
+    close_start = xml.rindex('</')
+    return xml[:open_end], xml[open_end:close_start], xml[close_start:]
+
+
+def _sheet_view(xml):
+    """Return the first ``<sheetView>`` match of sheet *xml*, adding ``<sheetViews>`` if missing."""
+    m = _SHEET_VIEW.search(xml)
+    if m is None:
+        before = _BEFORE_SHEET_VIEWS.search(xml)
+        if before is None:
+            raise PatchError("sheet has no sheetData")
+        xml = xml[:before.start()] + '<sheetViews><sheetView workbookViewId="0"/></sheetViews>' + xml[before.start():]
+        m = _SHEET_VIEW.search(xml)
+    return xml, m
+
+
+def _view_sheet(xml, selected, cell=None, top_left=None):
+    """Return sheet *xml* with its view tab-selected or not and *cell* selected.
+
+    With frozen or split panes the selection of the active pane is replaced
+    and the scroll position is left alone.
+    """
+    xml, m = _sheet_view(xml)
+    open_tag, body, close = _split_element(m.group())
+    open_tag = _set_attr(open_tag, 'tabSelected', '1' if selected else None)
+    if cell is not None:
+        pane = re.search(r'<pane\b[^>]*/>', body)
+        active_pane = _attrs(pane.group()).get('activePane', 'topLeft') if pane else 'topLeft'
+        pane_attr = '' if active_pane == 'topLeft' else f' pane="{active_pane}"'
+        selection = f'<selection{pane_attr} activeCell="{cell}" sqref="{cell}"/>'
+        for sel in _SELECTION.finditer(body):
+            if _attrs(sel.group()).get('pane', 'topLeft') == active_pane:
+                body = body[:sel.start()] + selection + body[sel.end():]
+                break
+        else:
+            at = pane.end() if pane else 0
+            body = body[:at] + selection + body[at:]
+        if pane is None and top_left is not None:
+            open_tag = _set_attr(open_tag, 'topLeftCell', top_left)
+    view = open_tag + body + close if body else open_tag[:-1] + '/>'
+    return xml[:m.start()] + view + xml[m.end():]
+
+
+def _activate(xml, index):
+    """Return workbook *xml* with sheet number *index* (0-based) as the visible, active tab."""
+    sheets = list(_SHEET.finditer(xml))
+    tag = sheets[index].group()
+    if 'state="' in tag:
+        xml = xml[:sheets[index].start()] + _set_attr(tag, 'state', None) + xml[sheets[index].end():]
+    m = _WORKBOOK_VIEW.search(xml)
+    if m is None:
+        at = xml.index('<sheets')
+        return xml[:at] + f'<bookViews><workbookView activeTab="{index}"/></bookViews>' + xml[at:]
+    tag = _set_attr(m.group(), 'activeTab', str(index) if index else None)
+    first = re.search(r'\sfirstSheet="(\d+)"', tag)
+    if first and int(first.group(1)) > index:
+        tag = _set_attr(tag, 'firstSheet', str(index) if index else None)
+    return xml[:m.start()] + tag + xml[m.end():]
+
+
+def set_views(path, active=None, selections=None, out_path=None):
+    """Set the active sheet and cell selections of the workbook at *path* without opening Excel.
+
+    *active* is a sheet name or a list of them in order of preference; the
+    first that exists becomes the active tab (and is unhidden if it was
+    hidden), like ``Sheet.Activate``. *selections* maps sheet names to
+    ``(cell, top_left)``: *cell* becomes the selection and active cell and,
+    unless *top_left* is None, the sheet is scrolled so that *top_left* is
+    the top-left visible cell. Sheet names are matched case-insensitively,
+    as Excel does; missing sheets are ignored.
+
+    Only ``xl/workbook.xml`` and the sheet parts whose view changes are
+    rewritten, and the file is left alone if nothing changes. Returns
+    ``(active sheet or None, [sheets whose selection was set], changed)``.
+    """
+    wanted = [active] if isinstance(active, str) else list(active or [])
+    selections = {name.lower(): cell for name, cell in (selections or {}).items()}
+    out_path = out_path or path
+    with zipfile.ZipFile(path) as zin:
+        parts = sheet_parts(zin)
+        by_lower = {name.lower(): name for name in parts}
+        active_name = next((by_lower[n.lower()] for n in wanted if n.lower() in by_lower), None)
+        selected = [name for name in parts if name.lower() in selections]
+        if active_name is None and not selected:
+            return None, [], False
+
+        replaced = {}
+        workbook = _read_xml(zin, 'xl/workbook.xml')
+        if active_name is not None:
+            index = list(parts).index(active_name)
+            new = _activate(workbook, index)
+            if new != workbook:
+                replaced['xl/workbook.xml'] = new.encode('utf-8')
+        for name, part in parts.items():
+            cell, top_left = selections.get(name.lower(), (None, None))
+            if active_name is None and cell is None:
+                continue
+            xml = _read_xml(zin, part)
+            tab_selected = name == active_name if active_name is not None else 'tabSelected="1"' in xml
+            new = _view_sheet(xml, tab_selected, cell, top_left)
+            if new != xml:
+                replaced[part] = new.encode('utf-8')
+        if not replaced:
+            return active_name, selected, False
+        tmp_path = out_path + '.patch.tmp'
+        _write_copy(zin, tmp_path, replaced)
+    os.replace(tmp_path, out_path)
+    return active_name, selected, True
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Persistent SQLite index of the ``DO & INV`` tree.
+
+The scripts in ``copypasterfile/`` and ``check data use/`` used to start
+with their own ``os.walk`` of the Dropbox tree and regex every file name.
+:class:`FileIndex` keeps path, size and mtime of every file together with
+the fields parsed from invoice-style names such as
+``MOS 0525 - 014 - DO & INV (Outlet).xlsx``:
+
+* ``prefix`` (``MOS``), ``mmyy`` (``0525``, or ``xx25`` for templates),
+  ``month``/``year`` (5, 2025; ``month`` is NULL for templates),
+  ``number`` (14) and ``doc_type`` (``DO & INV``, ``INV``, …);
+* ``account``: the first folder under the root (``Melvin - MOS Burger``).
+
+:meth:`FileIndex.refresh` is incremental: every indexed directory is
+``stat``-ed and only directories whose mtime moved are listed again. Adding,
+removing or renaming a file (which is also how Excel and Dropbox save)
+changes its directory's mtime; a file rewritten in place does not, so use
+``refresh(full=True)`` (``--full``) when exact sizes and mtimes matter.
+
+    python do_inv_index.py --account melvin --mmyy 0525 --type "DO & INV" --ext .xlsx
+    python do_inv_index.py --account melvin --month 5 --year 2025 --type "DO & INV" --ext .xlsx
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+ROOT_DIR = r"C:\Users\User\Dropbox\DO & INV\DO & INV 2025"
+# Outside Dropbox, so the index is not synced while it is being written.
+DB_PATH = os.path.join(os.path.expanduser('~'), '.do_inv_index.sqlite')
+
+NAME_PATTERN = re.compile(
+    r"^(.+?)\s*([0-9x]{2}\d{2})\s*-\s*([0-9x]{3})\s*-\s*([A-Z &]+)", re.IGNORECASE
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    account TEXT,
+    prefix TEXT,
+    mmyy TEXT,
+    month INTEGER,
+    year INTEGER,
+    number INTEGER,
+    doc_type TEXT
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS files_lookup ON files(mmyy, doc_type, ext);
+"""
+
+
+def parse_name(name: str) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[int],
+                                   Optional[int], Optional[str]]:
+    """Return ``(prefix, mmyy, month, year, number, doc_type)`` of a file name, or Nones."""
+    m = NAME_PATTERN.match(name)
+    if not m:
+        return None, None, None, None, None, None
+    prefix, mmyy, num, doc_type = m.groups()
+    mmyy = mmyy.lower()
+    month = int(mmyy[:2]) if mmyy[:2].isdigit() else None
+    number = int(num) if num.isdigit() else None
+    return prefix.strip(), mmyy, month, 2000 + int(mmyy[2:]), number, doc_type.strip().upper()
+
+
+class FileIndex:
+    """SQLite index of every file under *root*; see the module docstring."""
+
+    def __init__(self, root: str = ROOT_DIR, db_path: str = DB_PATH):
+        self.root = os.path.abspath(root)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _under_root(self) -> Tuple[str, tuple]:
+        # A range test instead of LIKE, whose _ and % wildcards may appear in paths.
+        prefix = os.path.join(self.root, '')
+        return "(path = ? OR (path >= ? AND path < ?))", (self.root, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+    def _account(self, dir_path: str) -> Optional[str]:
+        rel = os.path.relpath(dir_path, self.root)
+        return None if rel == os.curdir else rel.split(os.sep, 1)[0]
+
+    def _file_row(self, dir_path: str, entry: os.DirEntry, account: Optional[str]) -> tuple:
+        st = entry.stat()
+        return (entry.path, dir_path, entry.name, os.path.splitext(entry.name)[1].lower(),
+                st.st_size, st.st_mtime_ns, account) + parse_name(entry.name)
+
+    def refresh(self, full: bool = False) -> Tuple[int, int]:
+        """Bring the index up to date; return ``(directories listed, directories checked)``.
+
+        Directories whose mtime is unchanged keep their indexed files and
+        subdirectories; *full* lists every directory again.
+        """
+        under, under_args = self._under_root()
+        known = {row['path']: row['mtime_ns'] for row in self.conn.execute(
+            f"SELECT path, mtime_ns FROM dirs WHERE {under}", under_args)}
+        seen = set()
+        listed = 0
+        stack = [(self.root, None)]
+        with self.conn:
+            while stack:
+                dir_path, parent = stack.pop()
+                try:
+                    mtime_ns = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(dir_path)
+                if not full and known.get(dir_path) == mtime_ns:
+                    stack.extend((row[0], dir_path) for row in self.conn.execute(
+                        "SELECT path FROM dirs WHERE parent = ?", (dir_path,)))
+                    continue
+
+                account = self._account(dir_path)
+                rows, subdirs = [], []
+                try:
+                    with os.scandir(dir_path) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.path)
+                                elif entry.is_file():
+                                    rows.append(self._file_row(dir_path, entry, account))
+                            except OSError:
+                                continue
+                except OSError as exc:
+                    logging.warning(f"Cannot list {dir_path}: {exc}")
+                    continue
+                listed += 1
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (dir_path,))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (dir_path, parent, mtime_ns))
+                stack.extend((sub, dir_path) for sub in subdirs)
+
+            gone = [(path,) for path in known if path not in seen]
+            self.conn.executemany("DELETE FROM files WHERE dir = ?", gone)
+            self.conn.executemany("DELETE FROM dirs WHERE path = ?", gone)
+        return listed, len(seen)
+
+    def query(self, account: Optional[str] = None, mmyy: Optional[str] = None,
+              doc_type: Optional[str] = None, ext: Optional[Iterable[str]] = None,
+              prefix: Optional[str] = None, month: Optional[int] = None, year: Optional[int] = None,
+              name_like: Optional[str] = None) -> List[sqlite3.Row]:
+        """Return the indexed files matching every given field, ordered by path.
+
+        *account* and *name_like* are case-insensitive substrings, *ext* is
+        one extension or a list of them (``'.xlsx'``); the other fields must
+        match exactly (``doc_type`` and ``mmyy`` case-insensitively).
+        """
+        under, under_args = self._under_root()
+        where = [under]
+        args: list = list(under_args)
+        if account:
+            where.append("account LIKE ?")
+            args.append(f"%{account}%")
+        if name_like:
+            where.append("name LIKE ?")
+            args.append(f"%{name_like}%")
+        if mmyy:
+            where.append("mmyy = ?")
+            args.append(mmyy.lower())
+        if doc_type:
+            where.append("doc_type = ?")
+            args.append(doc_type.upper())
+        if prefix:
+            where.append("prefix = ? COLLATE NOCASE")
+            args.append(prefix)
+        if month is not None:
+            where.append("month = ?")
+            args.append(month)
+        if year is not None:
+            where.append("year = ?")
+            args.append(year)
+        if ext:
+            exts = [ext] if isinstance(ext, str) else list(ext)
+            where.append(f"ext IN ({', '.join('?' * len(exts))})")
+            args.extend(e.lower() for e in exts)
+        sql = f"SELECT * FROM files WHERE {' AND '.join(where)} ORDER BY path"
+        return self.conn.execute(sql, args).fetchall()
+
+
+def open_index(root: str = ROOT_DIR, db_path: str = DB_PATH, full: bool = False) -> FileIndex:
+    """Open the index for *root* and refresh it."""
+    index = FileIndex(root, db_path)
+    start = time.perf_counter()
+    listed, checked = index.refresh(full)
+    logging.info(f"Index refreshed: {listed} of {checked} directories listed in {time.perf_counter() - start:.2f}s")
+    return index
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Query the DO & INV file index")
+    parser.add_argument('--root', default=ROOT_DIR, help='tree to index (default: %(default)s)')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite file (default: %(default)s)')
+    parser.add_argument('--full', action='store_true', help='list every directory again')
+    parser.add_argument('--account', help='account folder, case-insensitive substring')
+    parser.add_argument('--mmyy', help='e.g. 0525, or xx25 for templates')
+    parser.add_argument('--type', dest='doc_type', help='document type, e.g. "DO & INV" or INV')
+    parser.add_argument('--ext', action='append', help='file extension, e.g. .xlsx (repeatable)')
+    parser.add_argument('--prefix', help='invoice prefix, e.g. MOS')
+    parser.add_argument('--month', type=int, help='month number, e.g. 5 (templates have none)')
+    parser.add_argument('--year', type=int, help='four-digit year, e.g. 2025')
+    parser.add_argument('--name', help='file name substring')
+    args = parser.parse_args()
+
+    with open_index(args.root, args.db, args.full) as index:
+        rows = index.query(args.account, args.mmyy, args.doc_type, args.ext, args.prefix,
+                           args.month, args.year, args.name)
+    for row in rows:
+        print(row['path'])
+    logging.info(f"{len(rows)} files")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Bounded-cost text encoding detection shared by the txt -> EPUB converters.
+
+Detection is tiered and never reads more than three sample windows, whatever
+the file size:
+
+1. byte order mark;
+2. UTF-16 null-byte heuristic, then trial decoding of windows taken from the
+   start, middle and end of the file with incremental decoders so a window
+   that ends (or, after resyncing, starts) mid-character is not rejected;
+3. chardet's ``UniversalDetector`` fed with the same windows, stopping as
+   soon as it is confident.
+
+Results are cached per (path, size, mtime) so a changed file is re-detected.
+"""
+import codecs
+import functools
+import logging
+import os
+from collections import OrderedDict
+from typing import BinaryIO, List, Optional, Tuple
+
+BOMS = (
+    # UTF-32 first: its little-endian BOM starts with the UTF-16 one.
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+CANDIDATES = ('utf-8', 'gb18030', 'gbk', 'big5')
+WINDOW_SIZE = 64 * 1024
+
+
+def read_windows(f: BinaryIO, size: int, window_size: int = WINDOW_SIZE) -> List[bytes]:
+    """Read up to three windows (start, middle, end) from binary file *f*.
+
+    Every window but the first is resynced to just after its first newline;
+    ``\\n`` is never part of a multi-byte character in UTF-8, GBK, GB18030 or
+    Big5, so the window then starts on a character boundary.
+    """
+    f.seek(0)
+    if size <= 3 * window_size:
+        return [f.read(size)]
+    windows = [f.read(window_size)]
+    for offset in ((size - window_size) // 2, size - window_size):
+        f.seek(offset)
+        chunk = f.read(window_size)
+        nl = chunk.find(b'\n')
+        if nl != -1:
+            windows.append(chunk[nl + 1:])
+    return windows
+
+
+def _decodes(windows: List[bytes], encoding: str) -> bool:
+    for chunk in windows:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(chunk, final=False)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _utf16_by_nulls(raw: bytes) -> Optional[str]:
+    if len(raw) < 4:
+        return None
+    null_even = raw[::2].count(0)
+    null_odd = raw[1::2].count(0)
+    if null_even > len(raw) * 0.3 and null_odd < len(raw) * 0.05:
+        return 'utf-16-le'
+    if null_odd > len(raw) * 0.3 and null_even < len(raw) * 0.05:
+        return 'utf-16-be'
+    return None
+
+
+def _chardet_guess(windows: List[bytes], block_size: int = 4096) -> Tuple[Optional[str], float]:
+    try:
+        from chardet.universaldetector import UniversalDetector
+    except ImportError:
+        return None, 0.0
+    detector = UniversalDetector()
+    for chunk in windows:
+        for i in range(0, len(chunk), block_size):
+            detector.feed(chunk[i:i + block_size])
+            if detector.done:
+                break
+        if detector.done:
+            break
+    result = detector.close()
+    return result.get('encoding'), result.get('confidence') or 0.0
+
+
+def sniff_encoding(f: BinaryIO, size: int, name: str = '<stream>',
+                   window_size: int = WINDOW_SIZE) -> Tuple[str, float]:
+    """Return ``(encoding, confidence)`` for the binary file *f* of *size* bytes.
+
+    *f* is left positioned at offset 0. Falls back to ``('utf-8', 0.0)``.
+    """
+    windows = read_windows(f, size, window_size)
+    f.seek(0)
+    head = windows[0] if windows else b''
+    for bom, enc in BOMS:
+        if head.startswith(bom):
+            return enc, 1.0
+
+    enc = _utf16_by_nulls(head[:4096])
+    if enc:
+        return enc, 0.9
+
+    for enc in CANDIDATES:
+        if _decodes(windows, enc):
+            return enc, 0.8
+
+    enc, confidence = _chardet_guess(windows)
+    if enc and confidence > 0.5:
+        return enc, confidence
+
+    logging.warning(f"{name} encoding not detected, falling back to utf-8 (ignore)")
+    return 'utf-8', 0.0
+
+
+def stat_cache(maxsize: int = 256):
+    """Cache a ``func(path, *args)`` per (path, size, mtime), keeping *maxsize* entries."""
+
+    def decorator(func):
+        cache: 'OrderedDict[tuple, object]' = OrderedDict()
+
+        @functools.wraps(func)
+        def wrapper(path: str, *args):
+            st = os.stat(path)
+            key = (os.path.abspath(path), st.st_size, st.st_mtime_ns) + args
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+            value = func(path, *args)
+            cache[key] = value
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+@stat_cache()
+def detect_encoding_with_confidence(file_path: str) -> Tuple[str, float]:
+    with open(file_path, 'rb') as f:
+        return sniff_encoding(f, os.fstat(f.fileno()).st_size, file_path)
+
+
+def detect_encoding(file_path: str) -> str:
+    return detect_encoding_with_confidence(file_path)[0]
+
+
+detect_encoding.cache_clear = detect_encoding_with_confidence.cache_clear
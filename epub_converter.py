@@ -1,142 +1,501 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import argparse
+import codecs
+import contextlib
+import csv
+import functools
 import os
 import re
 import uuid
 import zipfile
-import functools
 import logging
 import html
-import codecs
+import hashlib
+import io
+import itertools
+import mmap
+import shutil
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import List, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from encoding_detect import WINDOW_SIZE, detect_encoding, sniff_encoding
+from xhtml_writer import chapter_document, chapter_section, page_document
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-@functools.lru_cache(maxsize=None)
-def detect_encoding(file_path: str, sample_size: int = 4096) -> str:
-    with open(file_path, 'rb') as f:
-        raw = f.read(sample_size)
-
-    boms = {
-        codecs.BOM_UTF8: 'utf-8-sig',
-        codecs.BOM_UTF16_LE: 'utf-16-le',
-        codecs.BOM_UTF16_BE: 'utf-16-be',
-        codecs.BOM_UTF32_LE: 'utf-32-le',
-        codecs.BOM_UTF32_BE: 'utf-32-be',
-    }
-    for bom, enc in boms.items():
-        if raw.startswith(bom):
-            return enc
-
-    if len(raw) >= 4:
-        null_even = raw[::2].count(0)
-        null_odd = raw[1::2].count(0)
-        if null_even > len(raw) * 0.3 and null_odd < len(raw) * 0.05:
-            return 'utf-16-le'
-        if null_odd > len(raw) * 0.3 and null_even < len(raw) * 0.05:
-            return 'utf-16-be'
-
-    for enc in ('utf-8', 'gb18030', 'gbk', 'big5'):
-        try:
-            raw.decode(enc)
-            return enc
-        except UnicodeDecodeError:
-            continue
+# Characters allowed in XML 1.0 text (astral-plane characters are dropped too).
+_INVALID_XML_CHARS = re.compile('[^\t\n\r\x20-\ud7ff\ue000-\ufffd]+')
+# Encoded astral-plane characters, which clean_text also drops.
+_ASTRAL_BYTES = {
+    'utf-8': rb'[\xf0-\xf4][\x80-\xbf]{3}',
+    'gb18030': rb'[\x90-\xe3][\x30-\x39][\x81-\xfe][\x30-\x39]',
+}
 
-    try:
-        import chardet
-        guess = chardet.detect(raw)
-        if guess and guess['confidence'] > 0.5 and guess['encoding']:
-            return guess['encoding']
-    except ImportError:
-        pass
 
-    logging.warning(f"{file_path} encoding not detected, falling back to utf-8 (ignore)")
-    return 'utf-8'
+def clean_text(text: str) -> str:
+    return _INVALID_XML_CHARS.sub('', text)
 
 
-def clean_text(text: str) -> str:
-    allowed_chars = []
-    for ch in text:
-        code = ord(ch)
-        if ch in ('\t', '\n', '\r', ' ') or 0x20 <= code <= 0xD7FF or 0xE000 <= code <= 0xFFFD:
-            allowed_chars.append(ch)
-    return ''.join(allowed_chars)
+def iter_clean_lines(f: TextIO, block_size: int = 1 << 20) -> Iterator[str]:
+    """Yield the cleaned lines of text file *f* without their newline.
+
+    Lines are read and cleaned in blocks of about *block_size* characters so
+    the sanitizing regex runs once per block instead of once per line.
+    """
+    while True:
+        lines = f.readlines(block_size)
+        if not lines:
+            return
+        block = clean_text(''.join(lines))
+        if block.endswith('\n'):
+            block = block[:-1]
+        yield from block.split('\n')
+
+
+def _bytes_alternation(seqs: Iterable[bytes]) -> bytes:
+    """Regex matching any of the byte strings *seqs*, as a trie keyed by leading byte.
+
+    ``re`` tries the branches of ``a|b|c`` one by one; sharing prefixes and
+    folding single bytes into a character class keeps a failed match cheap.
+    """
+    groups: Dict[bytes, List[bytes]] = {}
+    optional = False
+    for seq in seqs:
+        if seq:
+            groups.setdefault(seq[:1], []).append(seq[1:])
+        else:
+            optional = True
+    singles = b''.join(re.escape(k) for k, rest in sorted(groups.items()) if rest == [b''] * len(rest))
+    parts = [b'[' + singles + b']'] if singles else []
+    parts.extend(re.escape(k) + _bytes_alternation(rest)
+                 for k, rest in sorted(groups.items()) if any(rest))
+    return b'(?:' + b'|'.join(parts) + (b')?' if optional else b')')
+
+
+class HeadingMatcher:
+    """Precompiled chapter heading detector.
+
+    ``matcher(line)`` cleans *line* first; :meth:`match_clean` skips that step
+    for lines that already went through :func:`clean_text`. :meth:`volume_clean`
+    recognises volume markers (第N卷/部/集, 卷N), either on a line of their own
+    or as the prefix of a chapter heading such as ``第一卷 第三章``.
+    """
+
+    SPECIAL = ("序", "序章", "楔子")
+    NUMERALS = "0-9零一二三四五六七八九十百千万〇两"
+
+    def __init__(self, max_len: int = 50):
+        self.max_len = max_len
+        n = self.NUMERALS
+        self.norm_re = re.compile(r"[\s:：.-]+")
+        self.chapter_re = re.compile(
+            rf"第[{n}]+(?:卷|季|集|部|册)?(?:第[{n}]+)?(?:章|回|篇|节|话)"
+        )
+        self.numbered_re = re.compile(rf"[{n.replace('零', '')}]{{1,4}}[、.．]\S")
+        self.volume_re = re.compile(rf"第[{n}]+(?:卷|部|集)|卷[{n}]+")
+        # A heading's first significant character is one of these; checking
+        # it first lets ordinary paragraphs skip every regex.
+        self.lead_strip = ''.join(
+            ch for ch in map(chr, range(0x3100)) if self.norm_re.fullmatch(ch)
+        ) + '：'
+        self.lead_chars = frozenset('第序楔' + ''.join(
+            chr(c) for c in range(ord('0'), ord('9') + 1)
+        ) + n[3:])
+
+    def match_clean(self, line: str) -> bool:
+        text = line.strip()
+        if not text or len(text) > self.max_len:
+            return False
+        lead = text.lstrip(self.lead_strip)
+        if not lead or lead[0] not in self.lead_chars:
+            return False
+        norm = self.norm_re.sub("", text)
+        if norm in self.SPECIAL:
+            return True
+        return bool(self.chapter_re.match(norm) or self.numbered_re.match(text))
+
+    def volume_clean(self, line: str) -> Optional[Tuple[str, str]]:
+        """Return ``(key, label)`` if *line* names a volume, else None.
+
+        *key* is the normalised volume number (e.g. ``第一卷``) used to notice
+        when a run of ``第一卷 第N章`` headings moves on to the next volume;
+        *label* is the text to show in the table of contents.
+        """
+        text = line.strip()
+        if not text or len(text) > self.max_len:
+            return None
+        lead = text.lstrip(self.lead_strip)
+        if not lead or lead[0] not in '第卷':
+            return None
+        norm = self.norm_re.sub("", text)
+        m = self.volume_re.match(norm)
+        if not m:
+            return None
+        key = m.group(0)
+        if self.match_clean(line):
+            return key, key
+        return key, text
+
+    def __call__(self, line: str) -> bool:
+        return self.match_clean(clean_text(line))
+
+    def scan_patterns(self, encoding: str, volumes: bool = False,
+                      lone_cr: bool = False) -> Tuple['re.Pattern[bytes]', 're.Pattern[bytes]']:
+        """Bytes regexes for lines that may be headings in *encoding*.
+
+        The first matches at the start of a line, the second matches a line
+        break followed by such a line. A candidate line starts with any run of
+        characters that stripping or :func:`clean_text` would remove, then one
+        of the lead characters; the match is a superset of real headings and
+        each candidate still has to pass :meth:`match_clean`.
+
+        Line breaks are ``\\n`` (which also ends CRLF lines) unless *lone_cr*
+        asks for bare ``\\r`` as well: a literal first byte lets ``re`` skip
+        ahead with a fast search, a character class does not.
+        """
+        def encoded(chars: Iterable[str]) -> List[bytes]:
+            out = []
+            for ch in chars:
+                try:
+                    out.append(ch.encode(encoding))
+                except UnicodeEncodeError:
+                    pass
+            return [_bytes_alternation(out)]
+
+        removable = set(self.lead_strip) - {'\r', '\n'}
+        removable.update(ch for ch in map(chr, range(0x10000))
+                         if not '\ud800' <= ch <= '\udfff' and _INVALID_XML_CHARS.match(ch))
+        skip = encoded(removable)
+        astral = _ASTRAL_BYTES.get(codecs.lookup(encoding).name)
+        if astral:
+            skip.insert(0, astral)
+        lead = encoded(self.lead_chars | {'卷'} if volumes else self.lead_chars)
+        head = b'(?:' + b'|'.join(skip) + b')*(?:' + b'|'.join(lead) + b')'
+        return re.compile(head), re.compile((b'[\r\n]' if lone_cr else b'\n') + head)
+
+
+_heading_matcher = HeadingMatcher()
+_scan_patterns = functools.lru_cache(maxsize=None)(_heading_matcher.scan_patterns)
 
 
 def is_chapter_heading(line: str) -> bool:
     """Return True if *line* looks like a chapter heading."""
-    text = clean_text(line).strip()
-    if not text or len(text) > 50:
-        return False
+    return _heading_matcher(line)
 
-    norm = re.sub(r"[\s:：.-]+", "", text)
-    if norm in ("序", "序章", "楔子"):
-        return True
 
-    pat1 = (
-        r"^第[0-9零一二三四五六七八九十百千万〇两]+(?:卷|季|集|部|册)?"
-        r"(?:第[0-9零一二三四五六七八九十百千万〇两]+)?(?:章|回|篇|节|话).*"
-    )
-    pat2 = r"^[0-9一二三四五六七八九十百千万〇两]{1,4}[、.．]\S+"
-    return bool(re.match(pat1, norm) or re.match(pat2, text))
+def volume_heading(line: str) -> Optional[str]:
+    """Return the volume label if *line* starts a volume (卷/部/集), else None."""
+    vol = _heading_matcher.volume_clean(clean_text(line))
+    return vol[1] if vol else None
+
+
+AUTHOR_PATTERN = re.compile(r"作者[:：]\s*(.+)")
 
 
 def detect_author(file_path: str, max_lines: int = 20) -> str:
     enc = detect_encoding(file_path)
-    pat = re.compile(r"作者[:：]\s*(.+)")
     with open(file_path, 'r', encoding=enc, errors='ignore') as f:
         for _ in range(max_lines):
             line = clean_text(f.readline())
             if not line:
                 break
-            m = pat.search(line)
+            m = AUTHOR_PATTERN.search(line)
             if m:
                 return m.group(1).strip()
     return ''
 
 
-def parse_chapters(file_path: str) -> List[Tuple[str, str]]:
-    enc = detect_encoding(file_path)
-    chapters: List[Tuple[str, str]] = []
+def _group_sections(lines: Iterable[str], is_heading, volume_of=None) -> Iterator[Tuple[str, Optional[str]]]:
+    """Core of :func:`iter_sections` with pluggable heading and volume tests."""
     title = None
     buffer: List[str] = []
-    with open(file_path, 'r', encoding=enc, errors='ignore') as f:
-        for raw in f:
-            line = clean_text(raw.rstrip('\n'))
-            if is_chapter_heading(line):
-                if title or buffer:
-                    chapters.append((title or '前言', '\n'.join(buffer)))
-                title = line
-                buffer = []
-            else:
-                buffer.append(line)
+    volume_key = None
+    for line in lines:
+        heading = is_heading(line)
+        vol = volume_of(line) if volume_of else None
+        if vol and (not heading or vol[0] != volume_key):
+            if title or buffer:
+                yield title or '前言', '\n'.join(buffer)
+                title, buffer = None, []
+            volume_key = vol[0]
+            yield vol[1], None
+            if not heading:
+                continue
+        if heading:
+            if title or buffer:
+                yield title or '前言', '\n'.join(buffer)
+            title = line
+            buffer = []
+        else:
+            buffer.append(line)
     if title or buffer:
-        chapters.append((title or '正文', '\n'.join(buffer)))
-    return chapters
+        yield title or '正文', '\n'.join(buffer)
+
+
+def iter_sections(lines: Iterable[str], volumes: bool = False) -> Iterator[Tuple[str, Optional[str]]]:
+    """Group cleaned *lines* into ``(title, text)`` chapters.
+
+    With *volumes*, a ``(label, None)`` marker is yielded whenever a new
+    volume starts, and stand-alone volume lines are not kept as chapter text.
+    """
+    return _group_sections(lines, _heading_matcher.match_clean,
+                           _heading_matcher.volume_clean if volumes else None)
+
+
+# Smallest file that use_mmap scans memory-mapped. Below this, compiling the
+# byte patterns costs more than the scan saves.
+MMAP_MIN_SIZE = 16 << 20
+
+# Codecs in which b'\r' and b'\n' never occur inside a multi-byte character.
+MMAP_CODECS = frozenset(('ascii', 'utf-8', 'utf-8-sig', 'gb18030', 'gbk', 'gb2312', 'big5'))
+
+
+_LINE_BREAK = re.compile(rb'[\r\n]')
+_LONE_CR = re.compile(rb'\r(?!\n)')
+# bytes.translate deletion tables keeping only bytes that clean_text may remove.
+_CONTROL_BYTES = frozenset(range(0x20)) - {0x09, 0x0a, 0x0d}
+_CLEAN_BYTES = bytes(b for b in range(256) if b not in _CONTROL_BYTES)
+_CLEAN_BYTES_UTF8 = bytes(b for b in range(256) if b not in _CONTROL_BYTES and not 0xf0 <= b <= 0xf4)
+
+
+class _Lines(str):
+    """One or more body lines joined by ``\\n``, never a heading."""
+
+
+def iter_sections_mmap(file_path: str, volumes: bool = False) -> Iterator[Tuple[str, Optional[str]]]:
+    """Like :func:`iter_sections` on *file_path*, scanning the memory-mapped bytes.
+
+    Candidate heading lines are found with :meth:`HeadingMatcher.scan_patterns`
+    and only they and the chapter bodies between them are decoded, so there
+    is no Python-level loop over lines. Falls back to the line parser for
+    encodings outside :data:`MMAP_CODECS` (e.g. UTF-16).
+    """
+    enc = detect_encoding(file_path)
+    codec = codecs.lookup(enc).name
+    if codec not in MMAP_CODECS:
+        with open(file_path, 'r', encoding=enc, errors='ignore') as f:
+            yield from iter_sections(iter_clean_lines(f), volumes)
+        return
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            if codec == 'utf-8-sig':
+                codec = 'utf-8'
+                if mm[:3] == codecs.BOM_UTF8:
+                    start = 3
+            yield from _group_sections(_scan_lines(mm, start, size, codec, volumes),
+                                       _mmap_heading,
+                                       _mmap_volume if volumes else None)
+
+
+def _mmap_heading(line: str) -> bool:
+    return type(line) is not _Lines and _heading_matcher.match_clean(line)
+
+
+def _mmap_volume(line: str) -> Optional[Tuple[str, str]]:
+    return None if type(line) is _Lines else _heading_matcher.volume_clean(line)
+
+
+def _decode_lines(buf, start: int, end: int, encoding: str) -> str:
+    # Same newline translation and cleaning as reading the file in text mode.
+    raw = buf[start:end]
+    text = raw.decode(encoding, 'ignore').replace('\r\n', '\n').replace('\r', '\n')
+    # clean_text is the slowest step; only run it when there may be
+    # something to remove. Control bytes are never part of a multi-byte
+    # character in MMAP_CODECS; only UTF-8 and GB18030 reach the astral plane.
+    if raw.translate(None, _CLEAN_BYTES_UTF8 if encoding == 'utf-8' else _CLEAN_BYTES):
+        return clean_text(text)
+    if '\ufffe' in text or '\uffff' in text:
+        return clean_text(text)
+    if encoding == 'gb18030' and len(text.encode('utf-16-le', 'surrogatepass')) != 2 * len(text):
+        return clean_text(text)
+    return text
+
+
+def _scan_lines(buf, start: int, size: int, encoding: str, volumes: bool) -> Iterator[str]:
+    """Yield the candidate heading lines of *buf*, with the lines between them as :class:`_Lines`."""
+    head_re, scan_re = _scan_patterns(encoding, volumes, _LONE_CR.search(buf, start) is not None)
+    if head_re.match(buf, start):
+        starts = itertools.chain((start,), (m.start() + 1 for m in scan_re.finditer(buf, start)))
+    else:
+        starts = (m.start() + 1 for m in scan_re.finditer(buf, start))
+    pos = start
+    for line_start in starts:
+        if line_start > pos:
+            yield _Lines(_decode_lines(buf, pos, line_start, encoding)[:-1])
+        m = _LINE_BREAK.search(buf, line_start)
+        line_end = m.start() if m else size
+        yield _decode_lines(buf, line_start, line_end, encoding)
+        pos = line_end + (2 if buf[line_end:line_end + 2] == b'\r\n' else 1)
+    if pos < size:
+        text = _decode_lines(buf, pos, size, encoding)
+        # As in iter_clean_lines, a last line that cleaning empties is dropped
+        # together with the newline before it.
+        if text or pos == start:
+            yield _Lines(text[:-1] if text.endswith('\n') else text)
+
+
+def parse_chapters(file_path: str, volumes: bool = False, use_mmap: bool = False,
+                   mmap_min_size: int = MMAP_MIN_SIZE) -> List[Tuple[str, Optional[str]]]:
+    """Return the chapters of *file_path*; see :func:`iter_sections` for *volumes*.
+
+    *use_mmap* scans the raw bytes with :func:`iter_sections_mmap` if the
+    file has at least *mmap_min_size* bytes. That gives the same result and
+    is faster on large books, but slower on small ones.
+    """
+    if use_mmap and os.path.getsize(file_path) >= mmap_min_size:
+        return list(iter_sections_mmap(file_path, volumes))
+    enc = detect_encoding(file_path)
+    with open(file_path, 'r', encoding=enc, errors='ignore') as f:
+        return list(iter_sections(iter_clean_lines(f), volumes))
 
 
 def chapter_to_xhtml(idx: int, title: str, text: str) -> str:
-    esc_title = html.escape(clean_text(title))
-    paras = [f"    <p>{html.escape(clean_text(p.strip()))}</p>" for p in text.splitlines() if p.strip()]
-    return (
-        "<?xml version='1.0' encoding='utf-8'?>\n"
-        "<html xmlns='http://www.w3.org/1999/xhtml'>\n<head>\n  <title>" + esc_title + "</title>\n  <link rel='stylesheet' type='text/css' href='style.css'/>\n</head>\n<body>\n  <h2 id='chap" + str(idx) + "'>" + esc_title + "</h2>\n" +
-        '\n'.join(paras) + "\n</body>\n</html>"
-    )
+    return chapter_document(idx, title, text, clean_text)
+
+
+class ConversionProfile:
+    """Stage timings and counters of one book, collected with ``--profile``.
 
+    Stages: ``detect`` (encoding), ``author``, ``parse`` (decoding and heading
+    detection), ``render`` (XHTML escaping), ``zip`` (writing chapters) and
+    ``index`` (nav, NCX, OPF and closing the archive).
+    """
 
-def create_epub(title: str, author: str, chapters: List[Tuple[str, str]], out_path: str, lang: str = 'zh'):
-    tmp_path = out_path + '.tmp'
-    uid = str(uuid.uuid4())
-    modified = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-    css = 'body { font-family: SimSun, serif; line-height:1.5; text-indent:2em; }'
+    STAGES = ('detect', 'author', 'parse', 'render', 'zip', 'index')
+    COUNTS = ('lines', 'chapters', 'volumes', 'bytes_in', 'bytes_out')
+
+    def __init__(self, book: str = ''):
+        self.book = book
+        self.times = dict.fromkeys(self.STAGES, 0.0)
+        self.counts = dict.fromkeys(self.COUNTS, 0)
+        self.total = 0.0
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += time.perf_counter() - start
 
-    with zipfile.ZipFile(tmp_path, 'w') as epub:
-        epub.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
-        epub.writestr(
+    def timed(self, name: str, items: Iterable) -> Iterator:
+        """Yield from *items*, charging the time spent producing each one to stage *name*."""
+        it = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.times[name] += time.perf_counter() - start
+                return
+            self.times[name] += time.perf_counter() - start
+            yield item
+
+    def count_sections(self, sections: Iterable[Tuple[str, Optional[str]]]) -> Iterator[Tuple[str, Optional[str]]]:
+        """Pass ``(title, text)`` sections through, counting chapters, volumes and lines."""
+        for title, text in sections:
+            if text is None:
+                self.counts['volumes'] += 1
+            else:
+                self.counts['chapters'] += 1
+                self.counts['lines'] += 1 + (text.count('\n') + 1 if text else 0)
+            yield title, text
+
+    def row(self) -> dict:
+        other = max(0.0, self.total - sum(self.times.values()))
+        mb = self.counts['bytes_in'] / (1024 * 1024)
+        return {
+            'book': self.book,
+            **{f'{name}_s': round(t, 6) for name, t in self.times.items()},
+            'other_s': round(other, 6),
+            'total_s': round(self.total, 6),
+            **self.counts,
+            'mb_per_s': round(mb / self.total, 3) if self.total > 0 else 0.0,
+        }
+
+
+class _NullProfile(ConversionProfile):
+    """Stand-in used when profiling is off; every hook is a no-op."""
+
+    _null = contextlib.nullcontext()
+
+    def stage(self, name: str):
+        return self._null
+
+    def timed(self, name: str, items: Iterable) -> Iterable:
+        return items
+
+    def count_sections(self, sections):
+        return sections
+
+
+NO_PROFILE = _NullProfile()
+
+
+class EpubWriter:
+    """Incremental EPUB writer.
+
+    Chapters are added one at a time and only their titles are kept; the
+    nav, NCX and OPF parts are streamed into the archive entry by entry when
+    the writer is closed, so memory stays flat even for 10k+ chapters.
+    *compresslevel* selects deflate (0 = store, 1 = fastest, 9 = smallest);
+    ``None`` keeps zipfile's default of storing everything uncompressed.
+    Media added with :meth:`add_media` is always stored, since images and
+    fonts are already compressed.
+
+    For giant books the table of contents can be made two-level: chapters
+    are grouped under the volumes passed to :meth:`start_volume`, or, with
+    *group_size*, into fixed-size buckets. With *merge_below*, consecutive
+    chapters are packed into one XHTML file until it holds at least that
+    many characters, so low-end readers open far fewer spine items.
+    """
+
+    MEDIA_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svgz', '.ttf', '.otf', '.woff', '.woff2')
+
+    def __init__(self, out_path: str, compresslevel: Optional[int] = None,
+                 group_size: int = 0, merge_below: int = 0,
+                 profile: ConversionProfile = NO_PROFILE):
+        self.out_path = out_path
+        self.profile = profile
+        self.tmp_path = out_path + '.tmp'
+        if compresslevel is None or compresslevel <= 0:
+            compression, compresslevel = zipfile.ZIP_STORED, None
+        else:
+            compression, compresslevel = zipfile.ZIP_DEFLATED, min(compresslevel, 9)
+        self.zip = zipfile.ZipFile(self.tmp_path, 'w', compression=compression, compresslevel=compresslevel)
+        self.group_size = group_size
+        self.merge_below = merge_below
+        self.titles: List[str] = []
+        # File number of every chapter, and (label, first chapter) per volume.
+        self.chapter_files: List[int] = []
+        self.volumes: List[Tuple[str, int]] = []
+        self.files = 0
+        self.media: List[Tuple[str, str]] = []
+        self._pending: List[str] = []
+        self._pending_title = ''
+        self._pending_len = 0
+        self._write_header()
+
+    def __enter__(self) -> 'EpubWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.zip.close()
+            os.remove(self.tmp_path)
+
+    def _write_header(self):
+        css = 'body { font-family: SimSun, serif; line-height:1.5; text-indent:2em; }'
+        self.zip.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        self.zip.writestr(
             'META-INF/container.xml',
             """<?xml version='1.0' encoding='UTF-8'?>
 <container version='1.0' xmlns='urn:oasis:names:tc:opendocument:xmlns:container'>
@@ -145,58 +504,133 @@ def create_epub(title: str, author: str, chapters: List[Tuple[str, str]], out_pa
   </rootfiles>
 </container>""",
         )
-        epub.writestr('OEBPS/style.css', css)
-
-        manifest = [
-            "<item id='nav' href='nav.xhtml' properties='nav' media-type='application/xhtml+xml'/>",
-            "<item id='css' href='style.css' media-type='text/css'/>",
-        ]
-        spine = []
-        nav_list = []
-
-        for i, (ch_title, ch_text) in enumerate(chapters, 1):
-            fname = f'chapter{i}.xhtml'
-            epub.writestr(f'OEBPS/{fname}', chapter_to_xhtml(i, ch_title, ch_text))
-            manifest.append(f"<item id='c{i}' href='{fname}' media-type='application/xhtml+xml'/>")
-            spine.append(f"<itemref idref='c{i}'/>")
-            nav_list.append(f"      <li><a href='{fname}#chap{i}'>{html.escape(ch_title)}</a></li>")
-
-        epub.writestr(
-            'OEBPS/nav.xhtml',
-            """<?xml version='1.0' encoding='utf-8'?>
+        self.zip.writestr('OEBPS/style.css', css)
+
+    def add_chapter(self, title: str, xhtml: str) -> int:
+        """Write the next chapter as its own page and return its 1-based index."""
+        self._flush()
+        self.titles.append(title)
+        self.files += 1
+        self.chapter_files.append(self.files)
+        with self.profile.stage('zip'):
+            self.zip.writestr(f'OEBPS/chapter{self.files}.xhtml', xhtml)
+        return len(self.titles)
+
+    def add_text_chapter(self, title: str, text: str) -> int:
+        idx = len(self.titles) + 1
+        if not self.merge_below:
+            with self.profile.stage('render'):
+                xhtml = chapter_to_xhtml(idx, title, text)
+            return self.add_chapter(title, xhtml)
+        with self.profile.stage('render'):
+            if not self._pending:
+                self._pending_title = clean_text(title)
+            self._pending.append(chapter_section(idx, title, text, clean_text))
+        self._pending_len += len(text)
+        self.titles.append(title)
+        self.chapter_files.append(self.files + 1)
+        if self._pending_len >= self.merge_below:
+            self._flush()
+        return idx
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self.files += 1
+        with self.profile.stage('render'):
+            xhtml = page_document(self._pending_title, self._pending)
+        with self.profile.stage('zip'):
+            self.zip.writestr(f'OEBPS/chapter{self.files}.xhtml', xhtml)
+        self._pending = []
+        self._pending_len = 0
+
+    def start_volume(self, label: str):
+        """Group the chapters added from now on under volume *label*."""
+        self._flush()
+        self.volumes.append((label, len(self.titles) + 1))
+
+    def add_media(self, href: str, data: bytes, media_type: str):
+        compress_type = zipfile.ZIP_STORED if href.lower().endswith(self.MEDIA_EXTENSIONS) else None
+        self.zip.writestr(f'OEBPS/{href}', data, compress_type=compress_type)
+        self.media.append((href, media_type))
+
+    def _stream(self, name: str, parts: Iterable[str]):
+        with self.zip.open(name, 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8', newline='') as out:
+            for part in parts:
+                out.write(part)
+
+    def _toc_groups(self) -> List[Tuple[Optional[str], int, int]]:
+        """Return ``(label, first, last)`` chapter ranges; label None = top level."""
+        n = len(self.titles)
+        if self.group_size and not self.volumes:
+            return [(f"第{i}-{min(i + self.group_size - 1, n)}章", i, min(i + self.group_size - 1, n))
+                    for i in range(1, n + 1, self.group_size)]
+        groups: List[Tuple[Optional[str], int, int]] = []
+        starts = [(label, first) for label, first in self.volumes if first <= n]
+        if not starts or starts[0][1] > 1:
+            groups.append((None, 1, starts[0][1] - 1 if starts else n))
+        for k, (label, first) in enumerate(starts):
+            last = starts[k + 1][1] - 1 if k + 1 < len(starts) else n
+            if last >= first:
+                groups.append((label, first, last))
+        return groups
+
+    def _href(self, i: int) -> str:
+        return f"chapter{self.chapter_files[i - 1]}.xhtml#chap{i}"
+
+    def _nav_parts(self, groups) -> Iterator[str]:
+        yield """<?xml version='1.0' encoding='utf-8'?>
 <html xmlns='http://www.w3.org/1999/xhtml'>
 <head><title>目录</title><link rel='stylesheet' type='text/css' href='style.css'/></head>
 <body><nav epub:type='toc' id='toc'><h1>目录</h1><ol>
 """
-            + ''.join(nav_list)
-            + "\n</ol></nav></body></html>",
-        )
+        for label, first, last in groups:
+            indent = '      '
+            if label is not None:
+                yield f"      <li><a href='{self._href(first)}'>{html.escape(label)}</a><ol>\n"
+                indent = '        '
+            for i in range(first, last + 1):
+                yield f"{indent}<li><a href='{self._href(i)}'>{html.escape(self.titles[i - 1])}</a></li>"
+            if label is not None:
+                yield "\n      </ol></li>\n"
+        yield "\n</ol></nav></body></html>"
 
-        nav_points = [
-            f"    <navPoint id='navPoint-{i}' playOrder='{i}'>\n      <navLabel><text>{html.escape(ch_title)}</text></navLabel>\n      <content src='chapter{i}.xhtml'/>\n    </navPoint>"
-            for i, (ch_title, _) in enumerate(chapters, 1)
-        ]
-        epub.writestr(
-            'OEBPS/toc.ncx',
+    def _ncx_parts(self, uid: str, title: str, groups) -> Iterator[str]:
+        depth = 2 if any(label is not None for label, _, _ in groups) else 1
+        yield (
             """<?xml version='1.0' encoding='utf-8'?>
 <!DOCTYPE ncx PUBLIC '-//NISO//DTD ncx 2005-1//EN' 'http://www.daisy.org/z3986/2005/ncx-2005-1.dtd'>
 <ncx xmlns='http://www.daisy.org/z3986/2005/ncx/' version='2005-1'>
   <head>
     <meta name='dtb:uid' content='"""
             + uid
-            + "'/>\n    <meta name='dtb:depth' content='1'/>\n    <meta name='dtb:totalPageCount' content='0'/>\n    <meta name='dtb:maxPageNumber' content='0'/>\n  </head>\n  <docTitle><text>"
+            + f"'/>\n    <meta name='dtb:depth' content='{depth}'/>\n    <meta name='dtb:totalPageCount' content='0'/>\n    <meta name='dtb:maxPageNumber' content='0'/>\n  </head>\n  <docTitle><text>"
             + html.escape(title)
             + "</text></docTitle>\n  <navMap>\n"
-            + '\n'.join(nav_points)
-            + "\n  </navMap>\n</ncx>",
         )
+        order = 0
+        sep = ''
+        for g, (label, first, last) in enumerate(groups, 1):
+            indent = '    '
+            if label is not None:
+                order += 1
+                yield (f"{sep}    <navPoint id='volume-{g}' playOrder='{order}'>\n      <navLabel><text>{html.escape(label)}</text></navLabel>"
+                       f"\n      <content src='{self._href(first)}'/>")
+                indent = '      '
+                sep = '\n'
+            for i in range(first, last + 1):
+                order += 1
+                src = self._href(i) if self.merge_below else f"chapter{self.chapter_files[i - 1]}.xhtml"
+                yield (f"{sep}{indent}<navPoint id='navPoint-{i}' playOrder='{order}'>\n{indent}  <navLabel><text>{html.escape(self.titles[i - 1])}</text></navLabel>"
+                       f"\n{indent}  <content src='{src}'/>\n{indent}</navPoint>")
+                sep = '\n'
+            if label is not None:
+                yield "\n    </navPoint>"
+        yield "\n  </navMap>\n</ncx>"
 
-        manifest.append("<item id='ncx' href='toc.ncx' media-type='application/x-dtbncx+xml'/>")
-        manifest_str = '\n    '.join(manifest)
-        spine_str = '\n    '.join(spine)
-
-        opf = (
-            f"""<?xml version='1.0' encoding='utf-8'?>
+    def _opf_parts(self, uid: str, title: str, author: str, lang: str) -> Iterator[str]:
+        modified = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        yield f"""<?xml version='1.0' encoding='utf-8'?>
 <package xmlns='http://www.idpf.org/2007/opf' unique-identifier='bookid' version='3.0'>
   <metadata xmlns:dc='http://purl.org/dc/elements/1.1/'>
     <dc:identifier id='bookid'>{uid}</dc:identifier>
@@ -206,40 +640,528 @@ def create_epub(title: str, author: str, chapters: List[Tuple[str, str]], out_pa
     <meta property='dcterms:modified'>{modified}</meta>
   </metadata>
   <manifest>
-    {manifest_str}
-  </manifest>
-  <spine toc='ncx'>
-    {spine_str}
-  </spine>
-</package>"""
-        )
-        epub.writestr('OEBPS/content.opf', opf)
-    os.replace(tmp_path, out_path)
-    logging.info(f"EPUB generated: {out_path}")
+    <item id='nav' href='nav.xhtml' properties='nav' media-type='application/xhtml+xml'/>
+    <item id='css' href='style.css' media-type='text/css'/>"""
+        for i in range(1, self.files + 1):
+            yield f"\n    <item id='c{i}' href='chapter{i}.xhtml' media-type='application/xhtml+xml'/>"
+        for i, (href, media_type) in enumerate(self.media, 1):
+            yield f"\n    <item id='m{i}' href='{href}' media-type='{media_type}'/>"
+        yield "\n    <item id='ncx' href='toc.ncx' media-type='application/x-dtbncx+xml'/>\n  </manifest>\n  <spine toc='ncx'>\n    "
+        for i in range(1, self.files + 1):
+            yield f"<itemref idref='c{i}'/>" if i == 1 else f"\n    <itemref idref='c{i}'/>"
+        yield "\n  </spine>\n</package>"
+
+    def close(self, title: str, author: str, lang: str = 'zh'):
+        """Write nav.xhtml, toc.ncx and content.opf, then move the book into place."""
+        self._flush()
+        with self.profile.stage('index'):
+            uid = str(uuid.uuid4())
+            groups = self._toc_groups()
+            self._stream('OEBPS/nav.xhtml', self._nav_parts(groups))
+            self._stream('OEBPS/toc.ncx', self._ncx_parts(uid, title, groups))
+            self._stream('OEBPS/content.opf', self._opf_parts(uid, title, author, lang))
+            self.zip.close()
+            os.replace(self.tmp_path, self.out_path)
+        logging.info(f"EPUB generated: {self.out_path}")
+
+
+def create_epub(title: str, author: str, chapters: List[Tuple[str, Optional[str]]], out_path: str,
+                lang: str = 'zh', compresslevel: Optional[int] = None, group_size: int = 0,
+                merge_below: int = 0, profile: ConversionProfile = NO_PROFILE):
+    """Write *chapters* to *out_path*; a ``(label, None)`` item starts a volume."""
+    with EpubWriter(out_path, compresslevel, group_size, merge_below, profile) as writer:
+        for ch_title, ch_text in profile.count_sections(chapters):
+            if ch_text is None:
+                writer.start_volume(ch_title)
+            else:
+                writer.add_text_chapter(ch_title, ch_text)
+        writer.close(title, author, lang)
+
+
+def stream_epub(in_file: str, title: str, out_path: str, lang: str = 'zh', **options) -> str:
+    """Convert *in_file* to *out_path* in a single decoding pass.
+
+    The encoding sample, the author line and the chapter headings all come
+    from one open file handle, and every chapter is written to the zip as soon
+    as the next heading closes it, so only one chapter is held in memory.
+    *options* are those of :func:`stream_epub_fileobj`. Returns the detected
+    author.
+    """
+    with open(in_file, 'rb') as raw:
+        return stream_epub_fileobj(raw, os.fstat(raw.fileno()).st_size, title, out_path, lang,
+                                   name=in_file, **options)
+
+
+def stream_epub_fileobj(raw: BinaryIO, size: int, title: str, out_path: str, lang: str = 'zh',
+                        max_author_lines: int = 20, name: str = '<stream>',
+                        compresslevel: Optional[int] = None, volumes: bool = False,
+                        group_size: int = 0, merge_below: int = 0,
+                        profile: ConversionProfile = NO_PROFILE) -> str:
+    """Like :func:`stream_epub` but reads from the seekable binary file *raw*.
+
+    *raw* may be an entry opened straight from a zip archive. *volumes*
+    groups chapters under detected 卷/部/集 headings; the other options are
+    those of :class:`EpubWriter`. Author detection is charged to the
+    ``parse`` stage of *profile*.
+    """
+    author = ''
+
+    def sniff_author(lines: Iterable[str]) -> Iterator[str]:
+        nonlocal author
+        for lineno, line in enumerate(lines):
+            if not author and lineno < max_author_lines:
+                m = AUTHOR_PATTERN.search(line)
+                if m:
+                    author = m.group(1).strip()
+            yield line
+
+    with EpubWriter(out_path, compresslevel, group_size, merge_below, profile) as writer:
+        with profile.stage('detect'):
+            enc, _ = sniff_encoding(raw, size, name)
+        with io.TextIOWrapper(raw, encoding=enc, errors='ignore') as f:
+            sections = iter_sections(sniff_author(iter_clean_lines(f)), volumes)
+            for ch_title, ch_text in profile.count_sections(profile.timed('parse', sections)):
+                if ch_text is None:
+                    writer.start_volume(ch_title)
+                else:
+                    writer.add_text_chapter(ch_title, ch_text)
+        writer.close(title, author, lang)
+    return author
+
+
+def epub_path_for(in_file: str, out_dir: str) -> str:
+    base = os.path.splitext(os.path.basename(in_file))[0]
+    return os.path.join(out_dir, f"{base}.epub")
+
 
+def convert_txt_stream(raw: BinaryIO, size: int, name: str, out_dir: str, lang: str = 'zh', **options) -> str:
+    """Convert the text file *name* read from binary file *raw* (e.g. a zip entry).
 
-def convert_txt_file(in_file: str, out_dir: str, lang: str):
+    *options* are those of :func:`stream_epub_fileobj`. Returns the path of
+    the written EPUB.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(name))[0]
+    out_file = epub_path_for(name, out_dir)
+    stream_epub_fileobj(raw, size, base, out_file, lang, name=name, **options)
+    return out_file
+
+
+def convert_txt_file(in_file: str, out_dir: str, lang: str, stream: bool = False,
+                     compresslevel: Optional[int] = None, volumes: bool = False,
+                     group_size: int = 0, merge_below: int = 0, use_mmap: bool = False,
+                     profile: ConversionProfile = NO_PROFILE):
+    """Convert *in_file* to ``<out_dir>/<name>.epub``.
+
+    Raises :class:`FileNotFoundError` if *in_file* is not a file, so batch
+    and watch mode count the book as failed.
+    """
     if not os.path.isfile(in_file):
-        logging.error(f"File not found: {in_file}")
-        return
+        raise FileNotFoundError(f"File not found: {in_file}")
     os.makedirs(out_dir, exist_ok=True)
     base = os.path.splitext(os.path.basename(in_file))[0]
-    author = detect_author(in_file)
-    chapters = parse_chapters(in_file)
-    out_file = os.path.join(out_dir, f"{base}.epub")
-    create_epub(base, author, chapters, out_file, lang)
+    out_file = epub_path_for(in_file, out_dir)
+    start = time.perf_counter()
+    if stream:
+        stream_epub(in_file, base, out_file, lang, compresslevel=compresslevel, volumes=volumes,
+                    group_size=group_size, merge_below=merge_below, profile=profile)
+    else:
+        with profile.stage('detect'):
+            detect_encoding(in_file)
+        with profile.stage('author'):
+            author = detect_author(in_file)
+        with profile.stage('parse'):
+            chapters = parse_chapters(in_file, volumes, use_mmap)
+        create_epub(base, author, chapters, out_file, lang, compresslevel, group_size, merge_below, profile)
+    if profile is not NO_PROFILE:
+        profile.total = time.perf_counter() - start
+        profile.counts['bytes_in'] = os.path.getsize(in_file)
+        profile.counts['bytes_out'] = os.path.getsize(out_file)
+
+
+_NORMALIZE_RE = re.compile('[\\s\ufeff]+')
+
+
+def normalize_text(text: str) -> str:
+    """*text* without whitespace, BOMs or invalid XML characters, for comparing books."""
+    return _NORMALIZE_RE.sub('', clean_text(text))
+
+
+def book_fingerprint(path: str, sample_chars: int = 4096, window_size: int = WINDOW_SIZE) -> str:
+    """Cheap fingerprint of *path*: its size in bytes and its first and last
+    *sample_chars* normalized characters.
+
+    Only one window at each end of the file is decoded, so the same book
+    extracted twice under different names gets the same fingerprint without
+    reading either copy in full; :func:`text_digest` confirms a match.
+    Copies saved in another encoding or with other line endings differ in
+    size and are not matched.
+    """
+    enc = detect_encoding(path)
+    codec = codecs.lookup(enc).name
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(window_size)
+        tail = b''
+        if size > window_size:
+            offset = max(window_size, size - window_size)
+            if codec.startswith(('utf-16', 'utf-32')):
+                unit = 4 if codec.startswith('utf-32') else 2
+                offset -= offset % unit
+            f.seek(offset)
+            tail = f.read()
+            if codec in MMAP_CODECS:
+                # Resync to a character boundary, as encoding_detect.read_windows does.
+                tail = tail[tail.find(b'\n') + 1:]
+    head_text = normalize_text(codecs.getincrementaldecoder(enc)('ignore').decode(head))
+    tail_text = normalize_text(tail.decode(codec, 'ignore')) if tail else head_text
+    sample = head_text[:sample_chars] + '\n' + tail_text[-sample_chars:]
+    return hashlib.sha1(f"{size}\n{sample}".encode('utf-8')).hexdigest()
+
+
+def text_digest(path: str, chunk_chars: int = 1 << 20) -> Tuple[int, str]:
+    """Return ``(length, sha1)`` of the whole normalized text of *path*."""
+    h = hashlib.sha1()
+    length = 0
+    with open(path, 'r', encoding=detect_encoding(path), errors='ignore') as f:
+        for chunk in iter(lambda: f.read(chunk_chars), ''):
+            text = normalize_text(chunk)
+            length += len(text)
+            h.update(text.encode('utf-8'))
+    return length, h.hexdigest()
+
+
+def find_duplicates(paths: Iterable[str]) -> Dict[str, str]:
+    """Map every duplicate book in *paths* to the copy that should be converted.
+
+    Books are grouped by :func:`book_fingerprint`; only books that share a
+    fingerprint are read in full with :func:`text_digest`. The copy whose
+    file name sorts first is kept. A book that cannot be read is logged and
+    treated as unique.
+    """
+    by_fingerprint: Dict[str, List[str]] = {}
+    for path in sorted(paths, key=os.path.basename):
+        try:
+            by_fingerprint.setdefault(book_fingerprint(path), []).append(path)
+        except OSError as exc:
+            logging.warning(f"Cannot fingerprint {path}: {exc}")
+    duplicates: Dict[str, str] = {}
+    for group in by_fingerprint.values():
+        if len(group) < 2:
+            continue
+        by_digest: Dict[Tuple[int, str], str] = {}
+        for path in group:
+            try:
+                digest = text_digest(path)
+            except OSError as exc:
+                logging.warning(f"Cannot read {path}: {exc}")
+                continue
+            original = by_digest.setdefault(digest, path)
+            if original != path:
+                duplicates[path] = original
+    return duplicates
+
+
+def link_output(src: str, dst: str):
+    """Make *dst* a hard link to *src*, copying where links are not supported."""
+    if os.path.exists(dst):
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
 
 
-def batch_convert(input_dir: str, output_dir: str, lang: str):
+class ConversionCache:
+    """Manifest of already converted sources, stored as JSON in *cache_dir*.
+
+    Each entry keeps the size, mtime and SHA-1 of a source ``.txt`` plus the
+    converter options it was built with. A book whose size and mtime are
+    unchanged is skipped on ``stat`` alone; if only the mtime moved, the hash
+    decides.
+
+    Options in :attr:`SPEED_OPTIONS` only change how a book is read, not the
+    EPUB that is written, so they are left out of the options key.
+    """
+
+    FILE_NAME = 'manifest.json'
+    SPEED_OPTIONS = frozenset(('stream', 'use_mmap'))
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, self.FILE_NAME)
+        self.entries: Dict[str, dict] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as exc:
+            logging.warning(f"Ignoring unreadable cache {self.path}: {exc}")
+
+    @staticmethod
+    def options_key(lang: str, options: dict) -> str:
+        key = {name: value for name, value in options.items() if name not in ConversionCache.SPEED_OPTIONS}
+        return json.dumps({'lang': lang, **key}, sort_keys=True)
+
+    def is_fresh(self, in_file: str, out_file: str, key: str) -> bool:
+        """True if *out_file* was built from the current *in_file* with options *key*.
+
+        A source that cannot be read (e.g. removed since it was listed) is
+        never fresh.
+        """
+        entry = self.entries.get(os.path.abspath(in_file))
+        if not entry or entry.get('options') != key or not os.path.isfile(out_file):
+            return False
+        try:
+            st = os.stat(in_file)
+            if entry['size'] != st.st_size:
+                return False
+            if entry['mtime'] == st.st_mtime_ns:
+                return True
+            if entry['sha1'] != file_digest(in_file):
+                return False
+        except OSError:
+            return False
+        entry['mtime'] = st.st_mtime_ns
+        return True
+
+    @staticmethod
+    def signature(in_file: str) -> dict:
+        """The ``size``/``mtime``/``sha1`` of *in_file* that :meth:`update` records."""
+        st = os.stat(in_file)
+        return {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha1': file_digest(in_file)}
+
+    def update(self, in_file: str, key: str, signature: Optional[dict] = None):
+        """Record *in_file* as built with options *key*.
+
+        *signature* is a :meth:`signature` taken elsewhere, e.g. by the
+        worker that converted the book; by default it is computed here.
+        """
+        self.entries[os.path.abspath(in_file)] = {**(signature or self.signature(in_file)), 'options': key}
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def _convert_one(in_file: str, out_dir: str, lang: str, options: dict, profile: bool = False
+                 ) -> Tuple[str, int, Optional[str], Optional[dict], Optional[dict]]:
+    """Worker for :func:`batch_convert`; returns (path, size, error, profile row, signature).
+
+    *signature* is the :meth:`ConversionCache.signature` of the converted
+    source, hashed here so the parent does not read every book again. It is
+    None if the conversion failed or the source changed while it ran.
+    """
+    stats = ConversionProfile(os.path.basename(in_file)) if profile else NO_PROFILE
+    try:
+        st = os.stat(in_file)
+        convert_txt_file(in_file, out_dir, lang, profile=stats, **options)
+    except Exception as exc:  # noqa: BLE001
+        return in_file, 0, f"{type(exc).__name__}: {exc}", None, None
+    try:
+        signature = ConversionCache.signature(in_file)
+    except OSError:
+        signature = None
+    if signature and (signature['size'], signature['mtime']) != (st.st_size, st.st_mtime_ns):
+        signature = None
+    return in_file, st.st_size, None, stats.row() if profile else None, signature
+
+
+def write_profile_report(rows: List[dict], report_dir: str, wall_seconds: float = 0.0) -> dict:
+    """Write per-book ``books.csv``/``books.json`` and an aggregated ``summary.json``."""
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, 'books.json'), 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False, indent=1)
+    if rows:
+        with open(os.path.join(report_dir, 'books.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    total = sum(r['total_s'] for r in rows)
+    stages = {}
+    for name in ConversionProfile.STAGES + ('other',):
+        seconds = sum(r[f'{name}_s'] for r in rows)
+        stages[name] = {'seconds': round(seconds, 3), 'share': round(seconds / total, 3) if total else 0.0}
+    counts = {name: sum(r[name] for r in rows) for name in ConversionProfile.COUNTS}
+    slowest = sorted(rows, key=lambda r: r['total_s'], reverse=True)[:10]
+    summary = {
+        'books': len(rows),
+        'book_seconds': round(total, 3),
+        'wall_seconds': round(wall_seconds, 3),
+        'mb_per_s': round(counts['bytes_in'] / (1024 * 1024) / total, 3) if total else 0.0,
+        'stages': stages,
+        'counts': counts,
+        'slowest': [{'book': r['book'], 'total_s': r['total_s'], 'mb_per_s': r['mb_per_s']} for r in slowest],
+    }
+    with open(os.path.join(report_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=1)
+
+    logging.info("Profile: " + ", ".join(
+        f"{name} {st['seconds']:.2f}s ({st['share']:.0%})" for name, st in stages.items()))
+    logging.info(f"Profile written to {report_dir}")
+    return summary
+
+
+def profile_slowest(rows: List[dict], paths: List[str], lang: str, options: dict,
+                    report_dir: str, top: int):
+    """Convert the *top* slowest books again under cProfile and dump their stats.
+
+    The books are rebuilt into a scratch directory so the real output is not
+    touched; ``<book>.prof`` can be loaded with :mod:`pstats` or snakeviz and
+    ``<book>.txt`` lists the 40 most expensive calls by cumulative time.
+    """
+    import cProfile
+    import pstats
+    import tempfile
+
+    by_name = {os.path.basename(p): p for p in paths}
+    slowest = sorted(rows, key=lambda r: r['total_s'], reverse=True)[:top]
+    out_dir = os.path.join(report_dir, 'cprofile')
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='epub-profile-') as scratch:
+        for row in slowest:
+            path = by_name[row['book']]
+            detect_encoding.cache_clear()
+            profiler = cProfile.Profile()
+            profiler.runcall(convert_txt_file, path, scratch, lang, **options)
+            stem = os.path.join(out_dir, os.path.splitext(row['book'])[0])
+            profiler.dump_stats(stem + '.prof')
+            with open(stem + '.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+            logging.info(f"cProfile stats for {row['book']} written to {stem}.prof")
+
+
+def _handle_duplicates(duplicates: Dict[str, str], output_dir: str, report_dir: str, link: bool):
+    report = []
+    for dup, original in sorted(duplicates.items()):
+        src, dst = epub_path_for(original, output_dir), epub_path_for(dup, output_dir)
+        linked = False
+        if link and os.path.isfile(src):
+            link_output(src, dst)
+            linked = True
+        logging.info(f"{os.path.basename(dup)} duplicates {os.path.basename(original)}"
+                     + (f", linked {os.path.basename(dst)}" if linked else ""))
+        report.append({'duplicate': dup, 'original': original, 'epub': dst if linked else src})
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, 'duplicates.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+def batch_convert(input_dir: str, output_dir: str, lang: str, jobs: int = 1, force: bool = False,
+                  cache_dir: Optional[str] = None, profile_dir: Optional[str] = None,
+                  profile_top: int = 0, dedupe: Optional[str] = None, **options) -> Dict[str, float]:
+    """Convert every ``.txt`` in *input_dir*, optionally on *jobs* processes.
+
+    Extra keyword *options* are passed through to :func:`convert_txt_file`.
+    Books recorded as unchanged in the :class:`ConversionCache` under
+    *cache_dir* (default ``<output_dir>/.epub_cache``) are skipped unless
+    *force* is set.
+
+    With *profile_dir*, every book is timed stage by stage (see
+    :class:`ConversionProfile`) and :func:`write_profile_report` writes the
+    results there; *profile_top* also dumps cProfile stats for that many of
+    the slowest books.
+
+    With *dedupe*, copies of the same book (see :func:`find_duplicates`) are
+    converted once: ``'report'`` only lists the duplicates in the log and in
+    ``duplicates.json`` next to the manifest, ``'link'`` also hard-links each
+    duplicate's EPUB to the one that was built.
+
+    A failing book is logged and skipped; the returned summary holds the
+    number of converted/failed books and the throughput in MB/s and books/s.
+    """
+    summary: Dict[str, float] = {
+        'books': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0, 'bytes': 0, 'seconds': 0.0, 'mb_per_s': 0.0,
+        'books_per_s': 0.0,
+    }
     if not os.path.isdir(input_dir):
         logging.error(f"Invalid input directory: {input_dir}")
-        return
+        return summary
     texts = [f for f in os.listdir(input_dir) if f.lower().endswith('.txt')]
     if not texts:
         logging.info("No .txt files found in input directory")
-        return
+        return summary
+
+    start = time.perf_counter()
+    cache = ConversionCache(cache_dir or os.path.join(output_dir, '.epub_cache'))
+    key = cache.options_key(lang, options)
+    duplicates: Dict[str, str] = {}
+    if dedupe:
+        duplicates = find_duplicates(os.path.join(input_dir, name) for name in texts)
+        summary['duplicates'] = len(duplicates)
+        if duplicates:
+            logging.info(f"Found {len(duplicates)} duplicate books; converting each book once")
+    paths = []
     for name in texts:
-        convert_txt_file(os.path.join(input_dir, name), output_dir, lang)
+        path = os.path.join(input_dir, name)
+        if path in duplicates:
+            continue
+        if not force and cache.is_fresh(path, epub_path_for(path, output_dir), key):
+            summary['skipped'] += 1
+            continue
+        paths.append(path)
+    if summary['skipped']:
+        logging.info(f"Skipping {summary['skipped']} unchanged books")
+    total = len(paths)
+    profile = profile_dir is not None
+    rows: List[dict] = []
+
+    def record(done: int, result: Tuple[str, int, Optional[str], Optional[dict], Optional[dict]]):
+        path, size, error, row, signature = result
+        if row:
+            rows.append(row)
+        name = os.path.basename(path)
+        if error:
+            summary['failed'] += 1
+            logging.error(f"[{done}/{total}] {name} failed: {error}")
+        else:
+            summary['books'] += 1
+            summary['bytes'] += size
+            if signature:
+                cache.update(path, key, signature)
+            logging.info(f"[{done}/{total}] {name} done")
+
+    if jobs > 1 and total > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, total)) as pool:
+            futures = [pool.submit(_convert_one, p, output_dir, lang, options, profile) for p in paths]
+            for done, fut in enumerate(as_completed(futures), 1):
+                record(done, fut.result())
+    else:
+        for done, path in enumerate(paths, 1):
+            record(done, _convert_one(path, output_dir, lang, options, profile))
+    cache.save()
+    if duplicates:
+        _handle_duplicates(duplicates, output_dir, cache.cache_dir, link=dedupe == 'link')
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = elapsed
+    if elapsed > 0:
+        summary['mb_per_s'] = summary['bytes'] / (1024 * 1024) / elapsed
+        summary['books_per_s'] = summary['books'] / elapsed
+    logging.info(
+        f"Converted {summary['books']}/{total} books ({summary['failed']} failed) in {elapsed:.2f}s: "
+        f"{summary['mb_per_s']:.2f} MB/s, {summary['books_per_s']:.2f} books/s"
+    )
+    if profile:
+        write_profile_report(rows, profile_dir, elapsed)
+        if profile_top > 0 and rows:
+            profile_slowest(rows, paths, lang, options, profile_dir, profile_top)
+    return summary
 
 
 def main():
@@ -249,8 +1171,53 @@ def main():
     parser.add_argument('-i', '--input', default=default_in, help='input directory')
     parser.add_argument('-o', '--output', default=default_out, help='output directory')
     parser.add_argument('--lang', default='zh', help='language code')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU)')
+    parser.add_argument('--stream', action='store_true',
+                        help='decode each file once and write chapters as they are parsed')
+    parser.add_argument('--compress-level', type=int, choices=range(0, 10), metavar='0-9',
+                        help='deflate level for chapters (1 = fastest, 9 = smallest; default: store)')
+    parser.add_argument('--mmap', action='store_true',
+                        help='find chapters in books of 16 MB or more by scanning the memory-mapped file')
+    parser.add_argument('--volumes', action='store_true',
+                        help='group chapters under 卷/部/集 headings in a two-level table of contents')
+    parser.add_argument('--group-size', type=int, default=0, metavar='N',
+                        help='group chapters into buckets of N in the table of contents')
+    parser.add_argument('--merge-below', type=int, default=0, metavar='CHARS',
+                        help='pack consecutive chapters into one XHTML file until it holds CHARS characters')
+    parser.add_argument('--force', action='store_true', help='rebuild books even if unchanged')
+    parser.add_argument('--cache-dir', help='conversion manifest directory (default: <output>/.epub_cache)')
+    parser.add_argument('--dedupe', choices=('report', 'link'),
+                        help='convert copies of the same book once; list the duplicates or hard-link their EPUBs')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every conversion stage per book and write a CSV/JSON report')
+    parser.add_argument('--profile-dir',
+                        help='profile report directory (default: <output>/.epub_profile/<timestamp>)')
+    parser.add_argument('--profile-top', type=int, default=0, metavar='N',
+                        help='with --profile, also dump cProfile stats for the N slowest books')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and convert new or changed .txt/.zip files as they appear')
+    parser.add_argument('--interval', type=float, default=1.0, help='watch: seconds between folder scans')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='watch: seconds a file must stay unchanged before it is picked up')
+    parser.add_argument('--queue-size', type=int, default=0,
+                        help='watch: maximum number of queued files (default: 4 per worker)')
     args = parser.parse_args()
-    batch_convert(args.input, args.output, args.lang)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    options = dict(stream=args.stream, compresslevel=args.compress_level, volumes=args.volumes,
+                   group_size=args.group_size, merge_below=args.merge_below, use_mmap=args.mmap)
+    if args.watch:
+        from epub_watch import watch
+        watch(args.input, args.output, args.lang, jobs, interval=args.interval, settle=args.settle,
+              queue_size=args.queue_size, cache_dir=args.cache_dir, **options)
+        return
+    profile_dir = None
+    if args.profile or args.profile_dir:
+        profile_dir = args.profile_dir or os.path.join(
+            args.output, '.epub_profile', time.strftime('%Y%m%d-%H%M%S'))
+    batch_convert(args.input, args.output, args.lang, jobs, force=args.force,
+                  cache_dir=args.cache_dir, profile_dir=profile_dir, profile_top=args.profile_top,
+                  dedupe=args.dedupe, **options)
 
 if __name__ == '__main__':
     main()
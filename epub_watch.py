@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Watch-folder mode for ``epub_converter.py``.
+
+The input folder is polled every *interval* seconds. A new or changed
+``.txt`` or ``.zip`` is only queued once its size and mtime have not moved
+for *settle* seconds, so files that are still being copied in are left
+alone. Queued files are handled by a bounded pool of worker processes:
+zips are extracted next to themselves (and their books queued straight
+away), books are converted with :func:`epub_converter.convert_txt_file`
+and recorded in the same :class:`~epub_converter.ConversionCache` that
+batch runs use. Cache lookups, which may hash a whole book, and manifest
+writes run on one background thread, so they never hold up the event loop
+or race each other.
+
+Queue depth and per-file latency (from first noticing a change to the EPUB
+being written) are logged for every file, summarised every
+*stats_interval* seconds and written to ``watch_stats.json`` in the cache
+directory.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from epub_converter import ConversionCache, _convert_one, epub_path_for
+from txttoepub.extractzipfile import extract_zip
+
+WATCHED_SUFFIXES = ('.txt', '.zip')
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class WatchStats:
+    """Counters and recent per-file timings of a :class:`FolderWatcher`."""
+
+    def __init__(self, history: int = 1000):
+        self.started = time.time()
+        self.done = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.recent: deque = deque(maxlen=history)
+
+    def queued(self, depth: int):
+        self.max_queued = max(self.max_queued, depth)
+
+    def record(self, name: str, wait: float, work: float, latency: float, ok: bool):
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+        self.recent.append({'file': name, 'wait_s': wait, 'work_s': work, 'latency_s': latency, 'ok': ok})
+
+    def snapshot(self, queued: int, running: int) -> dict:
+        latencies = [r['latency_s'] for r in self.recent]
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'queued': queued,
+            'max_queued': self.max_queued,
+            'running': running,
+            'done': self.done,
+            'failed': self.failed,
+            'latency_p50_s': round(_percentile(latencies, 50), 3),
+            'latency_p95_s': round(_percentile(latencies, 95), 3),
+            'latency_max_s': round(max(latencies, default=0.0), 3),
+            'recent': list(self.recent)[-20:],
+        }
+
+
+class FolderWatcher:
+    """Convert books dropped into *input_dir* until cancelled.
+
+    *jobs* worker processes take files from a queue of at most *queue_size*
+    entries; when it is full, scanning waits. Extra keyword *options* are
+    passed through to :func:`epub_converter.convert_txt_file`.
+    """
+
+    def __init__(self, input_dir: str, output_dir: str, lang: str = 'zh', jobs: int = 2,
+                 interval: float = 1.0, settle: float = 2.0, queue_size: int = 0,
+                 cache_dir: Optional[str] = None, stats_interval: float = 60.0, **options):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.lang = lang
+        self.jobs = max(1, jobs)
+        self.interval = interval
+        self.settle = settle
+        self.queue_size = queue_size or 4 * self.jobs
+        self.stats_interval = stats_interval
+        self.options = options
+        self.cache = ConversionCache(cache_dir or os.path.join(output_dir, '.epub_cache'))
+        self.key = self.cache.options_key(lang, options)
+        self.stats = WatchStats()
+        self.stats_path = os.path.join(self.cache.cache_dir, 'watch_stats.json')
+        # path -> {'sig': (size, mtime_ns), 'changed': t, 'seen': t, 'handled': sig or None}
+        self.files: Dict[str, dict] = {}
+        self.busy: set = set()
+        self.running = 0
+        self.cache_io: Optional[ThreadPoolExecutor] = None
+
+    def _stat_sig(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def scan(self, now: float) -> List[Tuple[str, Tuple[int, int], float]]:
+        """Update the file table; return ``(path, sig, seen)`` of settled files not yet handled."""
+        try:
+            entries = [e for e in os.scandir(self.input_dir)
+                       if e.name.lower().endswith(WATCHED_SUFFIXES) and e.is_file()]
+        except FileNotFoundError:
+            return []
+        present = set()
+        ready = []
+        for entry in entries:
+            path = entry.path
+            present.add(path)
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            state = self.files.get(path)
+            if state is None:
+                state = self.files[path] = {'sig': sig, 'changed': now, 'seen': now, 'handled': None}
+            elif state['sig'] != sig:
+                if state['handled'] == state['sig']:
+                    state['seen'] = now
+                state['sig'] = sig
+                state['changed'] = now
+            if state['handled'] == sig or path in self.busy or now - state['changed'] < self.settle:
+                continue
+            ready.append((path, sig, state['seen']))
+        for path in set(self.files) - present - self.busy:
+            del self.files[path]
+        return ready
+
+    async def _is_fresh(self, path: str) -> bool:
+        if not path.lower().endswith('.txt'):
+            return False
+        return await asyncio.get_running_loop().run_in_executor(
+            self.cache_io, self.cache.is_fresh, path, epub_path_for(path, self.output_dir), self.key)
+
+    def _record(self, path: str, signature: dict):
+        # Runs on the cache_io thread.
+        self.cache.update(path, self.key, signature)
+        self.cache.save()
+
+    def _queue_extracted(self, paths: List[str], seen: float):
+        # Extracted books are complete (written via os.replace), so skip the settle wait.
+        for path in paths:
+            if not path.lower().endswith('.txt'):
+                continue
+            sig = self._stat_sig(path)
+            if sig is not None:
+                self.files[path] = {'sig': sig, 'changed': seen - self.settle, 'seen': seen, 'handled': None}
+
+    async def _work(self, pool: ProcessPoolExecutor, queue: asyncio.Queue, wake: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        while True:
+            path, sig, seen, queued_at = await queue.get()
+            name = os.path.basename(path)
+            started = time.monotonic()
+            self.running += 1
+            error = None
+            try:
+                if path.lower().endswith('.zip'):
+                    written = await loop.run_in_executor(pool, extract_zip, path, self.input_dir)
+                    self._queue_extracted(written, seen)
+                    wake.set()
+                else:
+                    _, _, error, _, signature = await loop.run_in_executor(
+                        pool, _convert_one, path, self.output_dir, self.lang, self.options)
+                    if signature and (signature['size'], signature['mtime']) == sig:
+                        await loop.run_in_executor(self.cache_io, self._record, path, signature)
+            except Exception as exc:  # noqa: BLE001
+                error = f"{type(exc).__name__}: {exc}"
+            finally:
+                self.running -= 1
+                self.busy.discard(path)
+                queue.task_done()
+            done = time.monotonic()
+            self.stats.record(name, started - queued_at, done - started, done - seen, error is None)
+            if error:
+                logging.error(f"{name} failed: {error}")
+            else:
+                logging.info(f"{name} done in {done - seen:.1f}s "
+                             f"(work {done - started:.1f}s, queue {queue.qsize()})")
+
+    def write_stats(self, queued: int) -> dict:
+        snapshot = self.stats.snapshot(queued, self.running)
+        os.makedirs(self.cache.cache_dir, exist_ok=True)
+        tmp_path = self.stats_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.stats_path)
+        return snapshot
+
+    async def run(self):
+        if not os.path.isdir(self.input_dir):
+            logging.error(f"Invalid input directory: {self.input_dir}")
+            return
+        logging.info(f"Watching {self.input_dir} ({self.jobs} workers, settle {self.settle:g}s)")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        wake = asyncio.Event()
+        stop = asyncio.Event()
+
+        def request_stop():
+            stop.set()
+            wake.set()
+
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, request_stop)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows: stop with Ctrl+C instead
+        last_stats = time.monotonic()
+        reported = None
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool, ThreadPoolExecutor(max_workers=1) as cache_io:
+            self.cache_io = cache_io
+            workers = [asyncio.create_task(self._work(pool, queue, wake)) for _ in range(self.jobs)]
+            try:
+                while not stop.is_set():
+                    now = time.monotonic()
+                    for path, sig, seen in self.scan(now):
+                        if await self._is_fresh(path):
+                            if path in self.files:
+                                self.files[path]['handled'] = sig
+                            continue
+                        if path not in self.files:
+                            continue
+                        self.busy.add(path)
+                        self.files[path]['handled'] = sig
+                        await queue.put((path, sig, seen, time.monotonic()))
+                        self.stats.queued(queue.qsize())
+                    if now - last_stats >= self.stats_interval:
+                        last_stats = now
+                        counts = (self.stats.done, self.stats.failed, queue.qsize(), self.running)
+                        if counts != reported:
+                            reported = counts
+                            s = self.write_stats(queue.qsize())
+                            logging.info(
+                                f"{s['done']} done, {s['failed']} failed, queue {s['queued']} "
+                                f"(max {s['max_queued']}), latency p50 {s['latency_p50_s']:.1f}s "
+                                f"p95 {s['latency_p95_s']:.1f}s"
+                            )
+                    try:
+                        await asyncio.wait_for(wake.wait(), self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    wake.clear()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await loop.run_in_executor(cache_io, self.cache.save)
+                self.write_stats(queue.qsize())
+
+
+def watch(input_dir: str, output_dir: str, lang: str = 'zh', jobs: int = 2, **kwargs):
+    """Run a :class:`FolderWatcher` until interrupted with Ctrl+C or SIGTERM."""
+    watcher = FolderWatcher(input_dir, output_dir, lang, jobs, **kwargs)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+    s = watcher.stats.snapshot(0, 0)
+    logging.info(f"Stopped watching: {s['done']} done, {s['failed']} failed")
@@ -6,14 +6,34 @@ This script scans the directory ``C:\\Users\\User\\Dropbox\\DO & INV\\`` for
 trims whitespace from columns F and G in matching sheets. The special file
 ``Savori Sales Summary (2022 - 2025) - As of 20 May'25.xlsx`` is processed only
 on the sheet named ``delivery details`` (case-insensitive).
+
+Independent workbooks can be processed in parallel with ``--jobs`` and the
+results collected into one report with ``--report``. Workbooks are first
+scanned read-only; a workbook with nothing to trim is
+never fully loaded or re-saved, and trimmed cells are logged as one summary
+line per sheet. The size, mtime and SHA-1 of every processed workbook are
+kept in a state file, so workbooks untouched since the last run are skipped
+without being opened (``--force`` processes them anyway).
+
+``--dry-run manifest.jsonl`` only runs the read-only scan and writes every
+pending change (file, sheet, cell, old and new value) to a JSONL or ``.csv``
+manifest; ``--apply manifest.jsonl`` later writes exactly those cells,
+leaving any cell whose value no longer matches the manifest alone.
 """
 
+import argparse
+import csv
+import hashlib
+import json
 import logging
 import os
 import re
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
 
 from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
 
 ROOT_DIR = r"C:\Users\User\Dropbox\DO & INV"
 TARGET_FILE = os.path.join(
@@ -21,6 +41,17 @@ TARGET_FILE = os.path.join(
     "Savori Sales Summary (2022 - 2025) - As of 20 May'25.xlsx",
 )
 
+# Columns F and G.
+TRIM_MIN_COL = 6
+TRIM_MAX_COL = 7
+STATE_FILE = os.path.join(ROOT_DIR, ".sales_summary_state.json")
+# Cell references listed per sheet in the summary line; the rest go to DEBUG.
+LOG_SAMPLE = 5
+MANIFEST_FIELDS = ("file", "sheet", "cell", "old", "new")
+
+# (coordinate, old value, new value)
+Change = Tuple[str, str, str]
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
 
@@ -49,52 +80,366 @@ def target_sheets(workbook, path: str) -> List[str]:
     return [s for s in workbook.sheetnames if "sales summary" in s.lower()]
 
 
-def trim_columns(path: str) -> None:
-    """Open workbook at *path*, trim columns F and G, and save."""
+def find_trims(path: str) -> Dict[str, List[Change]]:
+    """Return ``{sheet: [(coordinate, old, trimmed), ...]}`` for cells of *path* to trim.
+
+    The workbook is opened read-only and only the values of columns F and G
+    of the target sheets are collected, which is much cheaper than a full
+    load. Read-only rows always start at row 1 and have no gaps.
+    """
+    letters = {col: get_column_letter(col) for col in range(TRIM_MIN_COL, TRIM_MAX_COL + 1)}
+    wb = load_workbook(path, read_only=True)
     try:
-        wb = load_workbook(path)
+        changes = {}
+        for sheet_name in target_sheets(wb, path):
+            rows = wb[sheet_name].iter_rows(min_col=TRIM_MIN_COL, max_col=TRIM_MAX_COL, values_only=True)
+            changes[sheet_name] = [
+                (f"{letters[col]}{r}", value, value.strip())
+                for r, row in enumerate(rows, 1)
+                for col, value in enumerate(row, TRIM_MIN_COL)
+                if isinstance(value, str) and value != value.strip()
+            ]
+        return changes
+    finally:
+        wb.close()
+
+
+def log_sheet_summary(path: str, sheet_name: str, cells: List[Change]) -> None:
+    """Log one line per sheet instead of one per trimmed cell."""
+    refs = [coord for coord, _, _ in cells]
+    sample = ", ".join(refs[:LOG_SAMPLE])
+    more = f" (+{len(refs) - LOG_SAMPLE} more)" if len(refs) > LOG_SAMPLE else ""
+    logging.info(f"{os.path.basename(path)} - {sheet_name}: {len(refs)} cells trimmed: {sample}{more}")
+    if more:
+        logging.debug(f"{os.path.basename(path)} - {sheet_name}: all trimmed cells: {', '.join(refs)}")
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TrimState:
+    """Size, mtime and SHA-1 of every workbook as this script last left it.
+
+    A workbook whose size and mtime are unchanged is skipped on ``stat``
+    alone; if only the mtime moved (e.g. Dropbox touched it), the hash
+    decides. Entries also record the trimmed columns, so changing them
+    invalidates the state.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rule = f"{get_column_letter(TRIM_MIN_COL)}:{get_column_letter(TRIM_MAX_COL)}"
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as exc:
+            logging.warning(f"Ignoring unreadable state file {path}: {exc}")
+
+    def is_unchanged(self, workbook: str) -> bool:
+        entry = self.entries.get(os.path.abspath(workbook))
+        if not entry or entry.get("rule") != self.rule:
+            return False
+        try:
+            st = os.stat(workbook)
+        except OSError:
+            return False
+        if entry["size"] != st.st_size:
+            return False
+        if entry["mtime"] == st.st_mtime_ns:
+            return True
+        if entry["sha1"] != file_digest(workbook):
+            return False
+        entry["mtime"] = st.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def update(self, workbook: str) -> None:
+        st = os.stat(workbook)
+        entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha1": file_digest(workbook), "rule": self.rule}
+        key = os.path.abspath(workbook)
+        if self.entries.get(key) != entry:
+            self.entries[key] = entry
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the state file, only if an entry changed since it was loaded."""
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _scan(path: str, result: dict) -> Optional[Dict[str, List[Change]]]:
+    try:
+        changes = find_trims(path)
     except Exception as exc:  # noqa: BLE001
         logging.warning(f"Unable to open {path}: {exc}")
-        return
+        result["error"] = f"open: {exc}"
+        return None
 
-    sheets = target_sheets(wb, path)
-    if not sheets:
+    if not changes:
         logging.warning(f"No target sheets in {path}")
+        return None
+
+    result["sheets"] = {name: len(cells) for name, cells in changes.items()}
+    return changes
+
+
+def _apply(path: str, changes: Dict[str, List[Change]], result: dict) -> None:
+    """Write *changes* into *path*, skipping cells whose value is no longer the old one."""
+    try:
+        wb = load_workbook(path)
+    except Exception as exc:  # noqa: BLE001
+        logging.warning(f"Unable to open {path}: {exc}")
+        result["error"] = f"open: {exc}"
         return
 
     changed = 0
-    for sheet_name in sheets:
+    for sheet_name, cells in changes.items():
+        if not cells:
+            continue
+        if sheet_name not in wb.sheetnames:
+            logging.warning(f"{os.path.basename(path)}: sheet {sheet_name!r} not found, skipped")
+            continue
         ws = wb[sheet_name]
-        for row in ws.iter_rows(min_col=6, max_col=7):
-            for cell in row:
-                val = cell.value
-                if isinstance(val, str):
-                    trimmed = val.strip()
-                    if trimmed != val:
-                        cell.value = trimmed
-                        changed += 1
-                        logging.info(
-                            f"{os.path.basename(path)} - {sheet_name}!{cell.coordinate} trimmed"
-                        )
+        applied = []
+        for coordinate, old, new in cells:
+            cell = ws[coordinate]
+            if cell.value != old:
+                logging.warning(f"{os.path.basename(path)} - {sheet_name}!{coordinate} changed since the scan, skipped")
+                continue
+            cell.value = new
+            applied.append((coordinate, old, new))
+        result["sheets"][sheet_name] = len(applied)
+        changed += len(applied)
+        if applied:
+            log_sheet_summary(path, sheet_name, applied)
 
+    if not changed:
+        logging.info(f"Nothing to change in {path}")
+        return
     try:
         wb.save(path)
+        result["changed"] = changed
         logging.info(f"Saved {path} ({changed} cells changed)")
     except Exception as exc:  # noqa: BLE001
         logging.error(f"Failed to save {path}: {exc}")
+        result["error"] = f"save: {exc}"
+
+
+def _trim(path: str, result: dict) -> None:
+    changes = _scan(path, result)
+    if changes is None:
+        return
+    if not any(changes.values()):
+        logging.info(f"Nothing to trim in {path}")
+        return
+    _apply(path, changes, result)
+
+
+def _dry_run(path: str, result: dict) -> None:
+    changes = _scan(path, result)
+    result["cells"] = [
+        dict(zip(MANIFEST_FIELDS, (path, sheet_name) + change))
+        for sheet_name, cells in (changes or {}).items()
+        for change in cells
+    ]
+
+
+def _run(func: Callable[..., None], path: str, *args) -> dict:
+    """Call ``func(path, *args, result)`` and return the timed result record."""
+    start = time.perf_counter()
+    result = {"file": path, "sheets": {}, "changed": 0, "seconds": 0.0, "error": None}
+    try:
+        func(path, *args, result)
+    except Exception as exc:  # noqa: BLE001
+        logging.error(f"Failed to process {path}: {exc}")
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def trim_columns(path: str) -> dict:
+    """Trim columns F and G of the target sheets in *path* and save.
+
+    A read-only pass finds the cells that need trimming; the workbook is
+    only fully loaded, edited and saved when there is at least one.
+    Returns a result record with the file, the cells trimmed per sheet, the
+    number of cells changed, the elapsed seconds and an error message or
+    ``None``.
+    """
+    return _run(_trim, path)
+
+
+def scan_file(path: str) -> dict:
+    """Read-only variant of :func:`trim_columns`: nothing is saved.
+
+    The result record's ``cells`` lists the pending changes as manifest rows.
+    """
+    return _run(_dry_run, path)
+
+
+def apply_changes(path: str, changes: Dict[str, List[Change]]) -> dict:
+    """Write the manifest *changes* for *path* and save it if any cell changed."""
+    return _run(_apply, path, changes)
+
+
+def process_files(files: List[str], jobs: int = 1, worker: Callable[..., dict] = trim_columns,
+                  args: Optional[Dict[str, tuple]] = None) -> List[dict]:
+    """Run ``worker(path, *args[path])`` on *files*, on *jobs* processes when > 1.
 
+    Workbooks are independent, so each one is handled by its own worker;
+    results come back in completion order.
+    """
+    args = args or {}
+    results = []
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            futures = {pool.submit(worker, path, *args.get(path, ())): path for path in files}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as exc:  # noqa: BLE001  (e.g. a worker process died)
+                    path = futures[future]
+                    logging.error(f"Failed to process {path}: {exc}")
+                    results.append({"file": path, "sheets": {}, "changed": 0, "seconds": 0.0,
+                                    "error": f"{type(exc).__name__}: {exc}"})
+    else:
+        for path in files:
+            logging.info(f"Processing {path}")
+            results.append(worker(path, *args.get(path, ())))
+    return results
 
-def main() -> None:
+
+def write_manifest(rows: List[dict], manifest_path: str) -> None:
+    """Write change rows as ``.csv`` or, for any other extension, JSON lines."""
+    with open(manifest_path, "w", encoding="utf-8", newline="") as f:
+        if manifest_path.lower().endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+            return
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def read_manifest(manifest_path: str) -> Dict[str, Dict[str, List[Change]]]:
+    """Return ``{file: {sheet: [(coordinate, old, new), ...]}}`` from a manifest."""
+    with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+        if manifest_path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    changes: Dict[str, Dict[str, List[Change]]] = {}
+    for row in rows:
+        changes.setdefault(row["file"], {}).setdefault(row["sheet"], []).append(
+            (row["cell"], row["old"], row["new"]))
+    return changes
+
+
+def write_report(results: List[dict], report_path: str, elapsed: float) -> None:
+    """Write *results* as one row per file and sheet (``.csv``) or as JSON."""
+    if report_path.lower().endswith(".csv"):
+        with open(report_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "sheet", "cells_trimmed", "file_changed", "seconds", "error"])
+            for r in results:
+                for sheet, cells in (r["sheets"] or {"": 0}).items():
+                    writer.writerow([r["file"], sheet, cells, r["changed"], r["seconds"], r["error"] or ""])
+        return
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"elapsed_s": round(elapsed, 3), "files": results}, f, ensure_ascii=False, indent=1)
+
+
+def log_report(results: List[dict], elapsed: float) -> None:
+    """Log one line per file plus the totals."""
+    for r in sorted(results, key=lambda r: r["file"]):
+        status = f"FAILED ({r['error']})" if r["error"] else f"{r['changed']} cells changed"
+        logging.info(f"{os.path.basename(r['file'])}: {len(r['sheets'])} sheets, {status}, {r['seconds']:.1f}s")
+    failed = sum(1 for r in results if r["error"])
+    logging.info(
+        f"{len(results)} files, {sum(len(r['sheets']) for r in results)} sheets, "
+        f"{sum(r['changed'] for r in results)} cells changed, {failed} failed in {elapsed:.1f}s"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Entry point."""
-    files = list_target_files()
+    parser = argparse.ArgumentParser(description="Trim columns F and G of the sales summary workbooks")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU)")
+    parser.add_argument("--report", help="write a JSON (or .csv) report of all files to this path")
+    parser.add_argument("--state", default=STATE_FILE,
+                        help="state file of already processed workbooks (default: %(default)s)")
+    parser.add_argument("--force", action="store_true",
+                        help="process every workbook, even if unchanged since the last run")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", metavar="MANIFEST",
+                      help="save nothing; write the pending changes to this .jsonl (or .csv) manifest")
+    mode.add_argument("--apply", metavar="MANIFEST", help="write only the changes listed in this manifest")
+    args = parser.parse_args(argv)
+
+    state = TrimState(args.state)
+    worker, worker_args = trim_columns, None
+    if args.apply:
+        worker, worker_args = apply_changes, {
+            path: (changes,) for path, changes in read_manifest(args.apply).items()
+        }
+        files = list(worker_args)
+        logging.info(f"Applying {sum(len(c) for (changes,) in worker_args.values() for c in changes.values())} "
+                     f"changes to {len(files)} files from {args.apply}")
+    else:
+        files = list_target_files()
+        if args.dry_run:
+            worker = scan_file
     if not files:
         logging.info("No matching Excel files found.")
         return
-    for file_path in files:
-        logging.info(f"Processing {file_path}")
-        trim_columns(file_path)
+    if not args.force and not args.apply:
+        pending = [path for path in files if not state.is_unchanged(path)]
+        if len(pending) < len(files):
+            logging.info(f"Skipping {len(files) - len(pending)} unchanged files")
+        files = pending
+    if not files:
+        state.save()
+        return
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    results = process_files(files, jobs, worker, worker_args)
+    elapsed = time.perf_counter() - start
+    if args.dry_run:
+        rows = [row for r in sorted(results, key=lambda r: r["file"]) for row in r.pop("cells", [])]
+        write_manifest(rows, args.dry_run)
+        log_report(results, elapsed)
+        logging.info(f"Dry run: {len(rows)} pending changes written to {args.dry_run}")
+        if args.report:
+            write_report(results, args.report, elapsed)
+        return
+    # An applied manifest may cover only part of a workbook, so only full runs mark it clean.
+    for r in results if not args.apply else ():
+        if not r["error"]:
+            state.update(r["file"])
+    try:
+        state.save()
+    except OSError as exc:
+        logging.warning(f"Unable to write state file {args.state}: {exc}")
+    log_report(results, elapsed)
+    if args.report:
+        write_report(results, args.report, elapsed)
+        logging.info(f"Report written to {args.report}")
 
 
 if __name__ == "__main__":
     main()
-
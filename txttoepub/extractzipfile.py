@@ -1,55 +1,86 @@
 import os
+import sys
+import threading
 import zipfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def extract_and_cleanup(folder_path, src_encoding='cp437', target_encoding='gbk'):
+def decode_name(zip_info, src_encoding='cp437', target_encoding='gbk'):
+    # 带 UTF-8 标志的文件名 zipfile 已经正确解码，其余按 cp437 → gbk 转换
+    if zip_info.flag_bits & 0x800:
+        return zip_info.filename
+    return zip_info.filename.encode(src_encoding).decode(target_encoding, 'ignore')
+
+def extract_zip(zip_path, folder, src_encoding='cp437', target_encoding='gbk', txt_handler=None):
+    # 解压单个 zip：每个文件直接写到目标文件夹（不再经过临时目录），
+    # 如果提供了 txt_handler，.txt 文件直接交给它处理而不落盘。
+    # 返回写到磁盘上的文件路径列表
+    folder = Path(folder)
+    written = []
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for zip_info in zip_ref.infolist():
+            # 跳过目录项，所有文件都平铺到目标文件夹
+            if zip_info.is_dir():
+                continue
+            decoded_name = decode_name(zip_info, src_encoding, target_encoding)
+            file_name = Path(decoded_name.replace('\\', '/')).name
+            if not file_name:
+                continue
+
+            if txt_handler is not None and file_name.lower().endswith('.txt'):
+                with zip_ref.open(zip_info) as src_file:
+                    txt_handler(file_name, src_file, zip_info.file_size)
+                continue
+
+            # 先写到同目录的临时文件再替换，重名时后写入的覆盖先前的
+            dest_file = folder / file_name
+            part_file = folder / '{}.{}.part'.format(file_name, threading.get_ident())
+            try:
+                with zip_ref.open(zip_info) as src_file, open(part_file, 'wb') as out_file:
+                    shutil.copyfileobj(src_file, out_file, 1024 * 1024)
+                os.replace(part_file, dest_file)
+                written.append(str(dest_file))
+            except Exception:
+                if part_file.exists():
+                    part_file.unlink()
+                raise
+
+    # 删除zip文件
+    Path(zip_path).unlink()
+    return written
+
+def epub_handoff(epub_output_dir, lang='zh'):
+    # 返回一个 txt_handler：把 zip 中的 .txt 直接流式交给 epub_converter 转换
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from epub_converter import convert_txt_stream
+
+    def handler(name, src_file, size):
+        convert_txt_stream(src_file, size, name, epub_output_dir, lang)
+
+    return handler
+
+def extract_and_cleanup(folder_path, src_encoding='cp437', target_encoding='gbk', workers=4, txt_handler=None):
     folder = Path(folder_path)
-    temp_dir = folder / "_temp_extract"
-    temp_dir.mkdir(exist_ok=True)
+    zip_paths = list(folder.glob('*.zip'))
 
-    for zip_path in folder.glob('*.zip'):
+    def process(zip_path):
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # 手动按编码转换文件名并解压
-                for zip_info in zip_ref.infolist():
-                    # 跳过根目录项
-                    if zip_info.filename.endswith('/'):
-                        # 创建目录
-                        decoded_dir = zip_info.filename.encode(src_encoding).decode(target_encoding, 'ignore')
-                        (temp_dir / decoded_dir).mkdir(parents=True, exist_ok=True)
-                        continue
-                    # 解码文件名
-                    decoded_name = zip_info.filename.encode(src_encoding).decode(target_encoding, 'ignore')
-                    dest_path = temp_dir / decoded_name
-                    dest_path.parent.mkdir(parents=True, exist_ok=True)
-                    # 写入文件内容
-                    with zip_ref.open(zip_info) as src_file, open(dest_path, 'wb') as out_file:
-                        shutil.copyfileobj(src_file, out_file)
-
-            # 将解压后的所有文件移动到目标文件夹
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    src_file = Path(root) / file
-                    dest_file = folder / file
-                    if dest_file.exists():
-                        dest_file.unlink()
-                    shutil.move(str(src_file), str(dest_file))
-
-            # 删除zip文件
-            zip_path.unlink()
-
-            # 清空临时目录
-            for item in temp_dir.iterdir():
-                if item.is_dir():
-                    shutil.rmtree(item)
-                else:
-                    item.unlink()
-
+            extract_zip(zip_path, folder, src_encoding, target_encoding, txt_handler)
+            return None
         except Exception as e:
-            print(f"处理 {zip_path.name} 时出错: {e}")
+            return "处理 {} 时出错: {}".format(zip_path.name, e)
+
+    # 各个 zip 相互独立，用线程池并行处理（解压时 zlib 会释放 GIL）
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for error in pool.map(process, zip_paths):
+            if error:
+                print(error)
 
 if __name__ == "__main__":
     target_folder = r"C:\Users\User\Desktop\txt to epub\txt file"
-    extract_and_cleanup(target_folder)
-    print("全部zip文件已处理完毕，已清理临时文件。")
\ No newline at end of file
+    # 设为 epub 输出目录即可让 zip 中的 txt 直接转换成 epub，不先解压到磁盘
+    epub_folder = None
+    handler = epub_handoff(epub_folder) if epub_folder else None
+    extract_and_cleanup(target_folder, txt_handler=handler)
+    print("全部zip文件已处理完毕。")
@@ -1,23 +1,24 @@
+import functools
+import html
 import os
 import re
 import sys
+from io import BytesIO
 from ebooklib import epub
-from bs4 import BeautifulSoup
-import chardet
 from PIL import Image, ImageDraw, ImageFont
 
-def txt_to_epub(txt_file, epub_output_dir):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from encoding_detect import detect_encoding_with_confidence
+from xhtml_writer import chapter_fragment
+
+def txt_to_epub(txt_file, epub_output_dir, cover_format='jpeg'):
     # 检查文件是否存在
     if not os.path.isfile(txt_file):
         print("文件不存在：{}".format(txt_file))
         return
 
     # 检测文件编码
-    with open(txt_file, 'rb') as f:
-        raw_data = f.read()
-    result = chardet.detect(raw_data)
-    encoding = result['encoding']
-    confidence = result['confidence']
+    encoding, confidence = detect_file_encoding(txt_file)
     print("处理文件：{}".format(txt_file))
     print("检测到的文件编码为：{}，置信度：{}".format(encoding, confidence))
 
@@ -50,27 +51,15 @@ def txt_to_epub(txt_file, epub_output_dir):
     book.add_author(author)
 
     # 生成封面图片
-    cover_image = generate_cover_image(title, author)
+    cover_image = generate_cover_image(title, author, cover_format)
     if cover_image:
-        book.set_cover("cover.jpg", cover_image)
+        book.set_cover(cover_file_name(cover_format), cover_image)
         print("已生成并添加封面图片。")
     else:
         print("未能生成封面图片，跳过添加封面。")
 
-    # 解析章节，假设章节标题格式为 "第X章"、"第X节"等
-    pattern = r'(第[\d一二三四五六七八九十百千万零两]+[章节卷回篇集部].*?)\n'
-    parts = re.split(pattern, content)
-    chapters = []
-
-    if len(parts) > 1:
-        # 文本按照 [内容, 章节标题, 章节内容, ...] 的方式分割
-        for i in range(1, len(parts), 2):
-            chap_title = parts[i].strip()
-            chap_content = parts[i + 1].strip()
-            chapters.append((chap_title, chap_content))
-    else:
-        # 如果未能分割章节，则将全文作为一个章节
-        chapters.append((title, content))
+    # 解析章节
+    chapters = split_chapters(content, title)
 
     # 添加章节到书籍
     epub_chapters = []
@@ -129,55 +118,79 @@ def txt_to_epub(txt_file, epub_output_dir):
 
     print("成功生成电子书：{}".format(epub_path))
 
+def detect_file_encoding(txt_file):
+    # 只读取文件开头、中间、结尾的样本检测编码，返回 (编码, 置信度)
+    return detect_encoding_with_confidence(txt_file)
+
+def split_chapters(content, title):
+    # 解析章节，假设章节标题格式为 "第X章"、"第X节"等
+    pattern = r'(第[\d一二三四五六七八九十百千万零两]+[章节卷回篇集部].*?)\n'
+    parts = re.split(pattern, content)
+    chapters = []
+
+    if len(parts) > 1:
+        # 文本按照 [内容, 章节标题, 章节内容, ...] 的方式分割
+        for i in range(1, len(parts), 2):
+            chap_title = parts[i].strip()
+            chap_content = parts[i + 1].strip()
+            chapters.append((chap_title, chap_content))
+    else:
+        # 如果未能分割章节，则将全文作为一个章节
+        chapters.append((title, content))
+    return chapters
+
 def create_chapter(title, content, index):
-    # 创建章节内容
-    soup = BeautifulSoup('', 'html.parser')
-
-    # 添加章节标题
-    h1 = soup.new_tag('h1')
-    h1.string = title
-    soup.append(h1)
-
-    # 将内容按段落分割
-    paragraphs = content.split('\n')
-    for para in paragraphs:
-        if para.strip():
-            p = soup.new_tag('p')
-            p.string = para.strip()
-            soup.append(p)
-
-    # 创建章节对象
+    # 创建章节对象，标题和段落直接转义拼接成 XHTML
     c = epub.EpubHtml(title=title, file_name='chap_{}.xhtml'.format(index), lang='zh')
-    c.content = str(soup)
+    c.content = chapter_fragment(title, content)
     c.add_item(epub.EpubItem(uid="style_nav", file_name="style/nav.css", media_type="text/css"))
     return c
 
-def generate_cover_image(title, author):
-    # 封面图片尺寸
-    width = 800
-    height = 1200
+# 封面格式：jpeg 为原来的 800x1200 JPEG；jpeg-small 为缩小并优化压缩的 JPEG；
+# png 为灰度 PNG；svg 为纯文字矢量封面（不需要字体文件，体积最小）
+COVER_FORMATS = {
+    'jpeg': ('cover.jpg', (800, 1200)),
+    'jpeg-small': ('cover.jpg', (480, 720)),
+    'png': ('cover.png', (800, 1200)),
+    'svg': ('cover.svg', (800, 1200)),
+}
+COVER_FONT = 'msyh.ttc'
+
+def cover_file_name(cover_format='jpeg'):
+    return COVER_FORMATS[cover_format][0]
+
+@functools.lru_cache(maxsize=None)
+def load_font(font_name, size):
+    # 每个进程每种字号只加载一次字体
+    try:
+        return ImageFont.truetype(font_name, size)
+    except IOError:
+        # 如果系统中没有该字体，使用默认字体
+        print("警告：系统中未找到字体 {}，将使用默认字体。".format(font_name))
+        return ImageFont.load_default()
+
+def generate_cover_image(title, author, cover_format='jpeg', font_name=COVER_FONT):
+    width, height = COVER_FORMATS[cover_format][1]
+    return _render_cover(title, author, width, height, font_name, cover_format)
+
+# 同一书名和作者的封面（例如重复转换同一本书）只渲染一次，最多保留 256 张
+@functools.lru_cache(maxsize=256)
+def _render_cover(title, author, width, height, font_name, cover_format):
+    if cover_format == 'svg':
+        return _render_svg_cover(title, author, width, height)
 
-    # 背景颜色
-    background_color = (255, 255, 255)  # 白色
+    # 字号按封面宽度缩放（800 宽时标题 60，作者 40）
+    font_title = load_font(font_name, width * 60 // 800)
+    font_author = load_font(font_name, width * 40 // 800)
 
-    # 字体颜色
-    text_color = (0, 0, 0)  # 黑色
+    # 白底黑字；PNG 用灰度图，压缩后更小
+    mode, background_color, text_color = ('L', 255, 0) if cover_format == 'png' else ('RGB', (255, 255, 255), (0, 0, 0))
 
     # 创建空白图片
-    image = Image.new('RGB', (width, height), background_color)
+    image = Image.new(mode, (width, height), background_color)
 
     draw = ImageDraw.Draw(image)
 
-    try:
-        # 尝试使用微软雅黑字体
-        font_title = ImageFont.truetype('msyh.ttc', 60)
-        font_author = ImageFont.truetype('msyh.ttc', 40)
-    except IOError:
-        # 如果系统中没有该字体，使用默认字体
-        font_title = ImageFont.load_default()
-        font_author = ImageFont.load_default()
-        print("警告：系统中未找到指定字体，将使用默认字体。")
-
     # 检查 Pillow 版本，选择合适的方法
     if hasattr(draw, 'textbbox'):
         # Pillow 10.0.0 及以上版本
@@ -194,7 +207,7 @@ def generate_cover_image(title, author):
         author_w, author_h = draw.textsize(author, font=font_author)
 
     title_x = (width - title_w) / 2
-    title_y = (height - title_h) / 2 - 50  # 向上偏移一些
+    title_y = (height - title_h) / 2 - height * 50 / 1200  # 向上偏移一些
 
     author_x = (width - author_w) / 2
     author_y = title_y + title_h + 20  # 标题下方
@@ -204,18 +217,39 @@ def generate_cover_image(title, author):
     draw.text((author_x, author_y), author, fill=text_color, font=font_author)
 
     # 将图片保存到内存中
-    from io import BytesIO
     image_bytes = BytesIO()
-    image.save(image_bytes, format='JPEG')
-    cover_content = image_bytes.getvalue()
-
-    return cover_content
+    if cover_format == 'png':
+        image.save(image_bytes, format='PNG', optimize=True)
+    elif cover_format == 'jpeg-small':
+        image.save(image_bytes, format='JPEG', quality=70, optimize=True)
+    else:
+        image.save(image_bytes, format='JPEG')
+    return image_bytes.getvalue()
+
+def _render_svg_cover(title, author, width, height):
+    # 纯文字 SVG 封面，由阅读器负责排版字体
+    svg = (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        "<svg xmlns='http://www.w3.org/2000/svg' width='{w}' height='{h}' viewBox='0 0 {w} {h}'>"
+        "<rect width='100%' height='100%' fill='#fff'/>"
+        "<text x='50%' y='{ty}' text-anchor='middle' font-size='{ts}' font-family='Microsoft YaHei, sans-serif'>{title}</text>"
+        "<text x='50%' y='{ay}' text-anchor='middle' font-size='{as_}' font-family='Microsoft YaHei, sans-serif'>{author}</text>"
+        "</svg>"
+    ).format(
+        w=width, h=height,
+        ty=height // 2 - 50, ts=width * 60 // 800, title=html.escape(title),
+        ay=height // 2 + 30, as_=width * 40 // 800, author=html.escape(author),
+    )
+    return svg.encode('utf-8')
 
 if __name__ == '__main__':
     # 输入和输出目录
     txt_input_dir = r'C:\Users\User\Desktop\txt to epub\txt file'
     epub_output_dir = r'C:\Users\User\Desktop\txt to epub\epub file'
 
+    # 封面格式（jpeg / jpeg-small / png / svg），批量转换时可选更小的格式
+    cover_format = 'jpeg'
+
     # 处理路径中的中文字符
     txt_input_dir = os.path.abspath(txt_input_dir)
     epub_output_dir = os.path.abspath(epub_output_dir)
@@ -234,6 +268,6 @@ if __name__ == '__main__':
 
     for txt_file in txt_files:
         txt_file_path = os.path.join(txt_input_dir, txt_file)
-        txt_to_epub(txt_file_path, epub_output_dir)
+        txt_to_epub(txt_file_path, epub_output_dir, cover_format)
 
     print("所有文件处理完毕。")
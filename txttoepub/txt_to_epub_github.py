@@ -3,59 +3,19 @@
 import argparse
 import os
 import re
+import sys
 import uuid
 import zipfile
-import functools
 import logging
 import html
-import codecs
 from datetime import datetime, timezone
 from typing import List, Tuple
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-
-@functools.lru_cache(maxsize=None)
-def detect_encoding(file_path: str, sample_size: int = 4096) -> str:
-    with open(file_path, 'rb') as f:
-        raw = f.read(sample_size)
-
-    boms = {
-        codecs.BOM_UTF8: 'utf-8-sig',
-        codecs.BOM_UTF16_LE: 'utf-16-le',
-        codecs.BOM_UTF16_BE: 'utf-16-be',
-        codecs.BOM_UTF32_LE: 'utf-32-le',
-        codecs.BOM_UTF32_BE: 'utf-32-be',
-    }
-    for bom, enc in boms.items():
-        if raw.startswith(bom):
-            return enc
-
-    if len(raw) >= 4:
-        null_even = raw[::2].count(0)
-        null_odd = raw[1::2].count(0)
-        if null_even > len(raw) * 0.3 and null_odd < len(raw) * 0.05:
-            return 'utf-16-le'
-        if null_odd > len(raw) * 0.3 and null_even < len(raw) * 0.05:
-            return 'utf-16-be'
-
-    for enc in ('utf-8', 'gb18030', 'gbk', 'big5'):
-        try:
-            raw.decode(enc)
-            return enc
-        except UnicodeDecodeError:
-            continue
-
-    try:
-        import chardet
-        guess = chardet.detect(raw)
-        if guess and guess['confidence'] > 0.5 and guess['encoding']:
-            return guess['encoding']
-    except ImportError:
-        pass
-
-    logging.warning(f"{file_path} encoding not detected, falling back to utf-8 (ignore)")
-    return 'utf-8'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from encoding_detect import detect_encoding
+from xhtml_writer import chapter_document
 
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 def clean_text(text: str) -> str:
     allowed_chars = []
@@ -119,13 +79,7 @@ def parse_chapters(file_path: str) -> List[Tuple[str, str]]:
 
 
 def chapter_to_xhtml(idx: int, title: str, text: str) -> str:
-    esc_title = html.escape(clean_text(title))
-    paras = [f"    <p>{html.escape(clean_text(p.strip()))}</p>" for p in text.splitlines() if p.strip()]
-    return (
-        "<?xml version='1.0' encoding='utf-8'?>\n"
-        "<html xmlns='http://www.w3.org/1999/xhtml'>\n<head>\n  <title>" + esc_title + "</title>\n  <link rel='stylesheet' type='text/css' href='style.css'/>\n</head>\n<body>\n  <h2 id='chap" + str(idx) + "'>" + esc_title + "</h2>\n" +
-        '\n'.join(paras) + "\n</body>\n</html>"
-    )
+    return chapter_document(idx, title, text, clean_text)
 
 
 def create_epub(title: str, author: str, chapters: List[Tuple[str, str]], out_path: str, lang: str = 'zh'):
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Escape-and-join XHTML emitters for chapter pages.
+
+Shared by ``epub_converter.py`` and the scripts in ``txttoepub/``. The whole
+chapter text is escaped in one ``html.escape`` call and then split into
+paragraphs; escaping never touches whitespace or line breaks, so this is
+equivalent to escaping each stripped paragraph on its own.
+"""
+import html
+from typing import Callable, Iterable, Optional
+
+
+def render_paragraphs(text: str, indent: str = '', sep: str = '', quote: bool = True,
+                      clean: Optional[Callable[[str], str]] = None) -> str:
+    """Return ``<p>`` elements for the non-blank lines of *text*, joined by *sep*."""
+    if clean is not None and clean(text) == text:
+        # One pass over the block is cheaper than cleaning every paragraph.
+        clean = None
+    lines = html.escape(text, quote).splitlines()
+    if clean is None:
+        return sep.join([f"{indent}<p>{p}</p>" for p in map(str.strip, lines) if p])
+    return sep.join([f"{indent}<p>{clean(p)}</p>" for p in map(str.strip, lines) if p])
+
+
+def chapter_fragment(title: str, content: str) -> str:
+    """Body markup for an ebooklib ``EpubHtml`` chapter: ``<h1>`` plus paragraphs.
+
+    Matches what ``str(BeautifulSoup)`` produced for the same tags, which only
+    escapes ``&``, ``<`` and ``>``, and splits paragraphs on ``\\n`` only.
+    """
+    paras = [f"<p>{p}</p>" for p in map(str.strip, html.escape(content, False).split('\n')) if p]
+    return f"<h1>{html.escape(title, False)}</h1>" + ''.join(paras)
+
+
+def chapter_section(idx: int, title: str, text: str,
+                    clean: Optional[Callable[[str], str]] = None) -> str:
+    """``<h2>`` heading and paragraphs of chapter *idx*, anchored as ``chap<idx>``."""
+    if clean is not None:
+        title = clean(title)
+    paras = render_paragraphs(text, indent='    ', sep='\n', clean=clean)
+    return "  <h2 id='chap" + str(idx) + "'>" + html.escape(title) + "</h2>\n" + paras
+
+
+def page_document(title: str, sections: Iterable[str]) -> str:
+    """Wrap one or more :func:`chapter_section` strings in a complete XHTML page."""
+    return (
+        "<?xml version='1.0' encoding='utf-8'?>\n"
+        "<html xmlns='http://www.w3.org/1999/xhtml'>\n<head>\n  <title>" + html.escape(title) + "</title>\n  <link rel='stylesheet' type='text/css' href='style.css'/>\n</head>\n<body>\n" +
+        '\n'.join(sections) + "\n</body>\n</html>"
+    )
+
+
+def chapter_document(idx: int, title: str, text: str,
+                     clean: Optional[Callable[[str], str]] = None) -> str:
+    """Complete XHTML page for chapter *idx*, as written by the zip-based converters."""
+    if clean is not None:
+        title = clean(title)
+    return page_document(title, [chapter_section(idx, title, text, clean)])